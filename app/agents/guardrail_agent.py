@@ -1,7 +1,12 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 from app.utils.pii_masking import has_pii, mask_pii
 import re
 
+# Terms that make a response violate policy; shared by the full and streaming checks
+POLICY_TERMS = ["illegal", "harmful", "dangerous"]
+# Replaces a response that fails output validation
+SAFETY_MESSAGE = "I apologize, but I cannot provide a response to this query due to safety concerns."
+
 class GuardrailAgent:
     def __init__(self):
         self.jailbreak_patterns = [
@@ -56,8 +61,7 @@ class GuardrailAgent:
             issues.append("potential_hallucination")
 
         # Check for policy violations
-        policy_violations = ["illegal", "harmful", "dangerous"]
-        for violation in policy_violations:
+        for violation in POLICY_TERMS:
             if violation in content.lower():
                 issues.append("policy_violation")
 
@@ -78,4 +82,53 @@ class GuardrailAgent:
         if context and context.get("urgency") == "high":
             return True
 
-        return False
\ No newline at end of file
+        return False
+
+
+class StreamingOutputGuardrail:
+    """Checks a response incrementally while it is being streamed.
+
+    `feed` takes each chunk and returns the text that is safe to release.
+    The last few characters (one less than the longest policy term) are held
+    back until the next chunk, so a term split across chunks is never partly
+    released. Once a policy term appears the stream is blocked and nothing
+    more is released. `close` releases the held-back text after running the
+    whole-response checks of GuardrailAgent.validate_output.
+    """
+
+    def __init__(self, guardrail: GuardrailAgent = None, policy_terms: List[str] = None):
+        self.guardrail = guardrail or GuardrailAgent()
+        self.policy_terms = [term.lower() for term in (policy_terms or POLICY_TERMS)]
+        self.lookback = max(len(term) for term in self.policy_terms) - 1
+        self._parts: List[str] = []
+        self._pending = ""
+        self.blocked = False
+        self.issues: List[str] = []
+
+    def feed(self, chunk: str) -> str:
+        if self.blocked:
+            return ""
+        self._parts.append(chunk)
+        # Terms fully inside earlier text were caught by earlier calls
+        window = self._pending + chunk
+        lowered = window.lower()
+        if any(term in lowered for term in self.policy_terms):
+            self.blocked = True
+            self.issues.append("policy_violation")
+            self._pending = ""
+            return ""
+        cut = max(len(window) - self.lookback, 0)
+        released, self._pending = window[:cut], window[cut:]
+        return released
+
+    def close(self) -> Tuple[str, Dict[str, Any]]:
+        """End the stream; returns (remaining text to release, validation of the whole response)."""
+        if self.blocked:
+            return "", {"valid": False, "issues": self.issues}
+        validation = self.guardrail.validate_output("".join(self._parts))
+        if not validation["valid"]:
+            self.blocked = True
+            self.issues = validation["issues"]
+            return "", validation
+        remaining, self._pending = self._pending, ""
+        return remaining, validation
@@ -1,72 +1,48 @@
 import requests
-from typing import List, Dict, Any
-from app.utils.embeddings import get_embeddings
-from app.db.chroma_client import store_document_embeddings
+from typing import Dict, Any, Iterator, Tuple
+from app.core.ingestion_pipeline import IngestionDocument, IngestionPipeline
+from app.utils.chunking import BLOCK_SIZE, iter_chunks, iter_file_blocks, mask_blocks
 from app.utils.pii_masking import mask_pii
 
 class IngestionAgent:
     async def ingest(self, source_type: str, value: str, metadata: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         Ingest content from various sources and store in vector database.
+        Sources are streamed, masked and chunked incrementally, so large files
+        and downloads are indexed with bounded memory.
         """
-        text = await self._extract_text(source_type, value)
-
-        if not text:
+        document = IngestionDocument(
+            source=value if source_type in ("url", "file") else source_type,
+            chunks=lambda: self._iter_chunks(source_type, value),
+            metadata=metadata,
+        )
+        result = (await IngestionPipeline().run([document]))[0]
+
+        if result["error"]:
+            return {"status": "error", "message": result["error"]}
+        if not result["chunks"]:
             return {"status": "error", "message": "No text extracted"}
 
-        # Mask PII
-        text = mask_pii(text)
-
-        # Chunk text
-        chunks = self._chunk_text(text)
-
-        # Generate embeddings
-        embeddings = await get_embeddings(chunks)
-
-        # Prepare metadata
-        if metadata is None:
-            metadata = {}
-        metadata_list = [metadata.copy() for _ in chunks]
-
-        # Store in ChromaDB
-        await store_document_embeddings(chunks, embeddings, metadata_list)
-
         return {
             "status": "completed",
-            "chunks_indexed": len(chunks),
+            "chunks_indexed": result["chunks"],
             "source_type": source_type
         }
 
-    async def _extract_text(self, source_type: str, value: str) -> str:
-        """Extract text based on source type."""
+    def _iter_blocks(self, source_type: str, value: str) -> Iterator[str]:
+        """Stream text blocks based on source type."""
         if source_type == "url":
-            # Assume it's a text URL, fetch content
-            try:
-                response = requests.get(value)
-                return response.text
-            except:
-                return ""
-        elif source_type == "text":
-            return value
+            # Assume it's a text URL, stream content
+            with requests.get(value, stream=True) as response:
+                response.encoding = response.encoding or "utf-8"
+                yield from response.iter_content(chunk_size=BLOCK_SIZE, decode_unicode=True)
         elif source_type == "file":
             # For now, assume text file
-            try:
-                with open(value, 'r') as f:
-                    return f.read()
-            except:
-                return ""
+            yield from iter_file_blocks(value)
         else:
-            return value
+            yield value
 
-    def _chunk_text(self, text: str, chunk_size: int = 1000, overlap: int = 200) -> List[str]:
-        """Chunk text into smaller pieces with overlap."""
-        chunks = []
-        start = 0
-        while start < len(text):
-            end = start + chunk_size
-            chunk = text[start:end]
-            chunks.append(chunk)
-            start = end - overlap
-            if start >= len(text):
-                break
-        return chunks
\ No newline at end of file
+    def _iter_chunks(self, source_type: str, value: str, chunk_size: int = 1000, overlap: int = 200) -> Iterator[Tuple[str, int, int]]:
+        """Mask PII and chunk the source into overlapping pieces."""
+        blocks = mask_blocks(self._iter_blocks(source_type, value), mask_pii)
+        return iter_chunks(blocks, chunk_size, overlap=overlap)
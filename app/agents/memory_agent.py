@@ -1,23 +1,25 @@
 from typing import List, Dict, Any
-from app.db.sqlite_client import get_memory_items, update_memory_item, delete_memory_item, create_memory_item
+from app.db.sqlite_client import get_memory_items, search_memory_items, update_memory_item, delete_memory_item, create_memory_items
 from app.utils.embeddings import get_embeddings
 from app.db.chroma_client import store_memory_embeddings, search_memory
 import uuid
 from datetime import datetime
 
 class MemoryAgent:
-    async def read_memory(self, query: str = None, memory_type: str = None, top_k: int = 5) -> List[Dict[str, Any]]:
+    async def read_memory(self, query: str = None, memory_type: str = None, top_k: int = 5, query_embedding: List[float] = None) -> List[Dict[str, Any]]:
         """
         Read memory items, optionally filtered by type or semantic search.
         Falls back to keyword search if embeddings fail (e.g., API key issues).
+        Pass query_embedding to reuse a vector already computed for this query.
         """
         if query:
             # Try semantic search first
             try:
-                query_embedding = await get_embeddings([query])
+                if query_embedding is None:
+                    query_embedding = (await get_embeddings([query]))[0]
                 # Check if we got valid embeddings (not all zeros indicating failure)
-                if query_embedding[0] and any(query_embedding[0]):
-                    results = await search_memory(query_embedding[0], memory_type, top_k, query_text=query)
+                if query_embedding and any(query_embedding):
+                    results = await search_memory(query_embedding, memory_type, top_k, query_text=query)
                     # Convert to memory item format
                     # Results structure: {"documents": [[...]], "ids": [[...]], "metadatas": [[...]]}
                     memories = []
@@ -38,27 +40,11 @@ class MemoryAgent:
             except Exception as e:
                 print(f"Semantic search failed, falling back to keyword search: {e}")
             
-            # Fallback: keyword-based search from SQLite
-            db_memories = get_memory_items()
-            if memory_type:
-                db_memories = [m for m in db_memories if m.get("type") == memory_type]
-            
-            # Simple keyword matching: prioritize memories that contain query words
-            query_words = set(query.lower().split())
-            scored_memories = []
-            for mem in db_memories:
-                content = mem.get("content", "").lower()
-                # Count matching words
-                matches = sum(1 for word in query_words if word in content)
-                if matches > 0:
-                    scored_memories.append((matches, mem))
-            
-            # Sort by match count (descending) and return top_k
-            scored_memories.sort(key=lambda x: x[0], reverse=True)
-            return [mem for _, mem in scored_memories[:top_k]]
+            # Fallback: ranked keyword search over the SQLite full-text index
+            return await search_memory_items(query, memory_type, top_k)
         else:
             # Get all memories from DB
-            db_memories = get_memory_items()
+            db_memories = await get_memory_items()
             if memory_type:
                 db_memories = [m for m in db_memories if m.get("type") == memory_type]
             return db_memories
@@ -67,22 +53,41 @@ class MemoryAgent:
         """
         Write a new memory item to both SQLite and ChromaDB.
         """
-        memory_id = str(uuid.uuid4())
+        memory_ids = await self.write_memories([{"content": content, "type": memory_type, "source": source}])
+        return memory_ids[0]
+
+    async def write_memories(self, batch: List[Dict[str, Any]]) -> List[str]:
+        """
+        Write several memory items ("content", "type", optional "source") to
+        SQLite and ChromaDB with one transaction, one embeddings request and
+        one ChromaDB add. Returns the new memory ids in order.
+        Items may bring their own "id"; writing the same ids again does not
+        create duplicates.
+        """
+        if not batch:
+            return []
+        items = [{"id": str(uuid.uuid4()), "source": None, **item} for item in batch]
 
         # Store in SQLite for persistent data store
-        create_memory_item(memory_id, content, memory_type, source)
+        memory_ids = await create_memory_items(items)
 
         # Try to store embeddings in ChromaDB for semantic search
-        # If embeddings fail (e.g., API key issue), it still gets stored in SQLite
+        # If embeddings fail (e.g., API key issue), they are still stored in SQLite
         try:
-            embeddings = await get_embeddings([content])
-            # Only store if we got valid embeddings
-            if embeddings[0] and any(embeddings[0]):
-                await store_memory_embeddings([content], embeddings, [memory_type])
+            embeddings = await get_embeddings([item["content"] for item in items])
+            # Only store items that got valid embeddings
+            embedded = [(item, embedding) for item, embedding in zip(items, embeddings) if embedding and any(embedding)]
+            if embedded:
+                await store_memory_embeddings(
+                    [item["content"] for item, _ in embedded],
+                    [embedding for _, embedding in embedded],
+                    [item["type"] for item, _ in embedded],
+                    ids=[item["id"] for item, _ in embedded]
+                )
         except Exception as e:
             print(f"Warning: Failed to store embeddings (will use keyword search): {e}")
 
-        return memory_id
+        return memory_ids
 
     async def update_memory(self, memory_id: str, content: str):
         """
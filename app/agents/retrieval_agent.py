@@ -1,22 +1,59 @@
+import asyncio
+import time
 from typing import List, Dict, Any
 from datetime import datetime
+from app.config import settings
 from app.utils.embeddings import get_embedding
-from app.db.chroma_client import search_documents, search_memory
+from app.db.chroma_client import search_documents, search_documents_dense, search_documents_lexical, search_memory
 from app.db.sqlite_client import log_observability_event
 
+# Each hybrid leg fetches this many times top_k so fusion has candidates to rerank
+HYBRID_CANDIDATE_FACTOR = 2
+
+
+def reciprocal_rank_fusion(result_sets: List[Dict[str, Any]], k: int = 60, n_results: int = 5) -> Dict[str, Any]:
+    """Fuse Chroma-shaped result sets by reciprocal rank: score(d) = sum 1 / (k + rank).
+
+    Returns the same shape with an extra `scores` list instead of distances.
+    """
+    scores: Dict[str, float] = {}
+    items: Dict[str, tuple] = {}
+    for results in result_sets:
+        ids = results.get("ids", [[]])[0]
+        documents = results.get("documents", [[]])[0]
+        metadatas = (results.get("metadatas") or [[]])[0] or [{}] * len(ids)
+        for rank, (doc_id, document, metadata) in enumerate(zip(ids, documents, metadatas), start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+            items.setdefault(doc_id, (document, metadata))
+
+    top = sorted(scores, key=lambda doc_id: -scores[doc_id])[:n_results]
+    return {
+        "documents": [[items[doc_id][0] for doc_id in top]],
+        "metadatas": [[items[doc_id][1] for doc_id in top]],
+        "ids": [top],
+        "scores": [[scores[doc_id] for doc_id in top]],
+    }
+
+
 class RetrievalAgent:
     def __init__(self, execution_id: str = None):
         self.execution_id = execution_id
 
-    async def retrieve(self, query: str, top_k: int = 5, include_memory: bool = True) -> Dict[str, Any]:
+    async def retrieve(self, query: str, top_k: int = 5, include_memory: bool = True, query_embedding: List[float] = None) -> Dict[str, Any]:
         """
         Retrieve relevant documents and memory for a query.
+        Pass query_embedding to reuse a vector already computed for this query.
         """
-        # Generate query embedding
-        query_embedding = await get_embedding(query)
+        # Generate query embedding unless the caller already has one
+        if query_embedding is None:
+            query_embedding = await get_embedding(query)
 
-        # Search documents with fallback to keyword search
-        doc_results = await search_documents(query_embedding, n_results=top_k, query_text=query)
+        timings = {}
+        if settings.retrieval_mode == "hybrid":
+            doc_results, timings = await self._hybrid_search(query, query_embedding, top_k)
+        else:
+            # Search documents with fallback to keyword search
+            doc_results = await search_documents(query_embedding, n_results=top_k, query_text=query)
 
         # Search memory if requested
         memory_results = {}
@@ -29,16 +66,36 @@ class RetrievalAgent:
                 datetime.utcnow(),
                 "tool_call",
                 "RetrievalAgent",
-                f"Query: {query}, Docs found: {len(doc_results.get('documents', []))} Memory items: {len(memory_results.get('documents', []))}",
+                f"Query: {query}, Docs found: {len(doc_results.get('documents', []))} Memory items: {len(memory_results.get('documents', []))}"
+                + "".join(f", {leg}={ms:.1f}" for leg, ms in timings.items()),
                 execution_id=self.execution_id
             )
 
         return {
             "documents": doc_results,
             "memory": memory_results,
-            "query": query
+            "query": query,
+            "timings": timings
         }
 
+    async def _hybrid_search(self, query: str, query_embedding: List[float], top_k: int):
+        """Run the dense and BM25 legs concurrently and fuse them with RRF.
+
+        Returns the fused results and per-leg latency in milliseconds.
+        """
+        async def timed(search):
+            start = time.perf_counter()
+            results = await search
+            return results, (time.perf_counter() - start) * 1000
+
+        candidates = top_k * HYBRID_CANDIDATE_FACTOR
+        (dense, dense_ms), (lexical, lexical_ms) = await asyncio.gather(
+            timed(search_documents_dense(query_embedding, candidates)),
+            timed(search_documents_lexical(query, candidates)),
+        )
+        fused = reciprocal_rank_fusion([dense, lexical], k=settings.rrf_k, n_results=top_k)
+        return fused, {"dense_ms": dense_ms, "lexical_ms": lexical_ms}
+
     async def retrieve_with_filter(self, query: str, filters: Dict[str, Any], top_k: int = 5) -> Dict[str, Any]:
         """
         Retrieve with metadata filters.
@@ -1,12 +1,10 @@
-import uuid
-from app.core.orchestrator import Orchestrator
+from app.core.orchestrator import orchestrator
 
 class SelfServiceAgent:
     def __init__(self):
-        self.orchestrator = Orchestrator()
+        self.orchestrator = orchestrator
 
     async def run(self, query: str):
-        execution_id = str(uuid.uuid4())
-        # Run query through orchestrator
-        await self.orchestrator.run_query(query, [], "self-service")
-        return execution_id
\ No newline at end of file
+        # Run query through the shared orchestrator's read-only pipeline
+        result = await self.orchestrator.run_query(query, [], "self-service")
+        return result["execution_id"]
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from pathlib import Path
+from typing import Dict, List
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -12,6 +13,82 @@ class Settings(BaseSettings):
     temperature: float = 0.7
     model_name: str = "gpt-4"
     secret_key: str = "your-secret-key-here"
+    # Embedding backend: "openai" (embedding_model over the API) or "hashing"
+    # (local CPU embedder with embedding_dimension). Vector sizes differ, so
+    # switching backends needs a fresh chroma_path.
+    embedding_provider: str = "openai"
+    embedding_model: str = "text-embedding-ada-002"
+    embedding_dimension: int = 384
+    # Embedding cache: in-memory LRU size and the SQLite file backing it
+    embedding_cache_size: int = 10000
+    embedding_cache_path: str = str(BASE_DIR / "embedding_cache.db")
+    # Embedding micro-batching: wait window and per-request limits
+    embedding_batch_window_ms: float = 5.0
+    embedding_max_batch_size: int = 256
+    embedding_max_batch_tokens: int = 50000
+    # Document retrieval: "hybrid" fuses dense and BM25 results with
+    # reciprocal rank fusion (rrf_k); "dense" uses BM25 only as a fallback
+    retrieval_mode: str = "hybrid"
+    rrf_k: int = 60
+    # Observability event sink: queue bound, rows per insert, how long the
+    # writer waits to fill a batch, and what to do when the queue backs up
+    # ("drop" new events when full, or "sample" info events once half full)
+    observability_queue_size: int = 10000
+    observability_batch_size: int = 200
+    observability_flush_interval_ms: float = 50.0
+    observability_overload_policy: str = "sample"
+    observability_sample_rate: float = 0.1
+    # Live execution streams: events kept per execution (streamed tokens
+    # count too) and executions kept
+    event_bus_history_size: int = 2000
+    event_bus_max_executions: int = 1000
+    # LLM gateway: connection pool, concurrent requests per model (with
+    # per-model overrides as JSON, e.g. {"gpt-4": 4}), request timeout, and
+    # retries with jittered exponential backoff between these delays
+    llm_max_connections: int = 100
+    llm_max_keepalive_connections: int = 20
+    llm_max_concurrency: int = 16
+    llm_model_concurrency: Dict[str, int] = {}
+    llm_timeout_seconds: float = 60.0
+    llm_max_retries: int = 3
+    llm_retry_base_delay: float = 0.5
+    llm_retry_max_delay: float = 8.0
+    # Circuit breakers for chat and embedding calls: consecutive failed
+    # requests before calls are skipped for the fallbacks, and seconds
+    # before a single probe request is let through again
+    circuit_breaker_failure_threshold: int = 5
+    circuit_breaker_recovery_seconds: float = 30.0
+    # Semantic response cache: a query reuses the answer to an earlier query
+    # of the same mode whose embedding has at least this cosine similarity,
+    # for up to ttl seconds; emptied whenever documents are ingested. Only
+    # for the listed modes (JSON), since chat answers depend on the user's
+    # memories and conversation
+    response_cache_enabled: bool = True
+    response_cache_modes: List[str] = ["incident"]
+    response_cache_threshold: float = 0.95
+    response_cache_ttl_seconds: float = 300.0
+    response_cache_max_entries: int = 1000
+    # Memory write-behind: memories written per batch, and how long the
+    # worker waits for a batch to fill
+    memory_outbox_batch_size: int = 32
+    memory_outbox_flush_interval_ms: float = 100.0
+    # Threads for SQLite reads on the request path (writes use one thread),
+    # for ChromaDB queries and for ChromaDB writes, kept apart so ingestion
+    # can't starve queries; calls beyond the queue size wait for a slot
+    db_read_workers: int = 4
+    chroma_read_workers: int = 4
+    chroma_write_workers: int = 2
+    executor_queue_size: int = 256
+    # Queries while data/ is still loading: "serve" answers from the partial
+    # index, "reject" returns 503 until loading finishes
+    warmup_policy: str = "serve"
+    # Ingestion pipeline: worker counts per stage, chunks per embedding call,
+    # embedding batches combined per Chroma upsert, and the queue bound
+    ingestion_read_workers: int = 4
+    ingestion_embed_workers: int = 4
+    ingestion_embed_batch_size: int = 64
+    ingestion_store_batch_size: int = 8
+    ingestion_queue_size: int = 16
 
     class Config:
         env_file = ".env"
@@ -31,6 +108,10 @@ try:
     chroma_path_obj = Path(settings.chroma_path)
     if not chroma_path_obj.is_absolute():
         settings.chroma_path = str(BASE_DIR / chroma_path_obj)
+
+    embedding_cache_path_obj = Path(settings.embedding_cache_path)
+    if not embedding_cache_path_obj.is_absolute():
+        settings.embedding_cache_path = str(BASE_DIR / embedding_cache_path_obj)
 except Exception:
     # Best-effort normalization; if anything fails, keep original settings
     pass
\ No newline at end of file
@@ -1,42 +1,161 @@
 import asyncio
+import hashlib
+import json
 from pathlib import Path
-from typing import List
-from app.db.chroma_client import store_document_embeddings
-from app.utils.embeddings import get_embeddings
+from typing import Any, Dict, Iterator, Tuple
+from app.config import settings
+from app.core.ingestion_pipeline import IngestionDocument, IngestionPipeline
+from app.db.chroma_client import delete_document_embeddings
+from app.utils.embeddings import embedding_service
+from app.utils.chunking import iter_chunks, iter_file_blocks
 from app.db.sqlite_client import log_observability_event
 from datetime import datetime
 
 
 CHUNK_SIZE = 800
+# JSON files up to this size are parsed and compacted before chunking;
+# larger ones are streamed as-is
+JSON_COMPACT_MAX_BYTES = 16 * 1024 * 1024
+DATA_SUFFIXES = {".txt", ".md", ".json", ".csv"}
+MANIFEST_VERSION = 2
 
 
-def _chunk_text(text: str, chunk_size: int = CHUNK_SIZE) -> List[str]:
+class HotloadProgress:
+    """Progress of the current or last hotload run, reported by /ready."""
+
+    def __init__(self):
+        self.state = "idle"  # idle, loading, ready, failed
+        self.total_files = 0
+        self.processed_files = 0
+        self.loaded_files = 0
+        self.skipped_files = 0
+        self.failed_files = 0
+        self.started_at = None
+        self.finished_at = None
+        self.error = None
+
+    def start(self):
+        self.__init__()
+        self.state = "loading"
+        self.started_at = datetime.utcnow()
+
+    def file_done(self, outcome: str):
+        """Count a processed file; outcome is "loaded", "skipped" or "failed"."""
+        self.processed_files += 1
+        setattr(self, f"{outcome}_files", getattr(self, f"{outcome}_files") + 1)
+
+    def finish(self, error: str = None):
+        self.state = "failed" if error else "ready"
+        self.error = error
+        self.finished_at = datetime.utcnow()
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "total_files": self.total_files,
+            "processed_files": self.processed_files,
+            "loaded_files": self.loaded_files,
+            "skipped_files": self.skipped_files,
+            "failed_files": self.failed_files,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "error": self.error,
+        }
+
+
+# Global instance
+hotload_progress = HotloadProgress()
+
+
+def _manifest_path() -> Path:
+    # Kept next to the vector store so wiping one resets the other
+    return Path(settings.chroma_path) / "hotload_manifest.json"
+
+
+def _load_manifest() -> Dict[str, Any]:
+    """Load the hotload manifest, starting fresh if it is missing, unreadable or stale."""
+    empty = {"version": MANIFEST_VERSION, "embedding_model": embedding_service.model, "files": {}}
+    try:
+        manifest = json.loads(_manifest_path().read_text(encoding="utf-8"))
+    except Exception:
+        return empty
+    # Vectors from another embedding model can't be mixed into the collection
+    if manifest.get("version") != MANIFEST_VERSION or manifest.get("embedding_model") != embedding_service.model:
+        return empty
+    return manifest
+
+
+def _save_manifest(manifest: Dict[str, Any]):
+    path = _manifest_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(manifest, indent=1, sort_keys=True), encoding="utf-8")
+    tmp_path.replace(path)
+
+
+def _file_hash(file: Path) -> str:
+    digest = hashlib.sha256()
+    with open(file, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _chunk_id_prefix(source: str, content_hash: str) -> str:
+    """Stable chunk id prefix so re-adding the same file version is idempotent."""
+    return "doc_" + hashlib.sha256(f"{source}\0{content_hash}".encode("utf-8")).hexdigest()[:16]
+
+
+def _iter_file_chunks(file: Path) -> Iterator[Tuple[str, int, int]]:
+    """Stream (chunk, start, end) tuples from a data file without loading it whole."""
+    # For JSON files, try to compact to string
+    if file.suffix.lower() == ".json" and file.stat().st_size <= JSON_COMPACT_MAX_BYTES:
+        content = file.read_text(encoding='utf-8')
+        try:
+            parsed = json.loads(content)
+            # if dict/list, stringify; else keep raw
+            if isinstance(parsed, (dict, list)):
+                content = json.dumps(parsed)
+        except Exception:
+            pass
+        return iter_chunks([content], CHUNK_SIZE, split_on_boundary=True)
+
     # Simple fixed-size chunking preserving word boundaries when possible
-    chunks = []
-    start = 0
-    length = len(text)
-    while start < length:
-        end = min(start + chunk_size, length)
-        # try to break at newline or space
-        if end < length:
-            sep = text.rfind('\n', start, end)
-            if sep <= start:
-                sep = text.rfind(' ', start, end)
-            if sep > start:
-                end = sep
-        chunk = text[start:end].strip()
-        if chunk:
-            chunks.append(chunk)
-        start = end
-    return chunks
+    return iter_chunks(iter_file_blocks(file), CHUNK_SIZE, split_on_boundary=True)
 
 
 async def hotload_data(path: Path = None):
+    """Run a hotload and record its progress in `hotload_progress`.
+
+    Safe to run as a background task: failures are recorded rather than raised.
+    """
+    hotload_progress.start()
+    try:
+        await _hotload(path)
+    except Exception as e:
+        log_observability_event(datetime.utcnow(), "data_loader", "DataLoader", f"Hotload failed: {e}", level="error")
+        hotload_progress.finish(error=str(e))
+    else:
+        hotload_progress.finish()
+
+
+async def _hotload(path: Path = None):
     """Hotload static files from the `data/` folder into the documents collection.
 
     This function reads text-like files under the `data` directory, splits them
     into chunks, computes embeddings, and stores them in Chroma's `documents`
-    collection so the RetrievalAgent can find them via semantic search.
+    collection so the RetrievalAgent can find them via semantic search. Files
+    go through the shared IngestionPipeline, so reading, embedding and storing
+    overlap across files.
+
+    A manifest of path, size, mtime and content hash per file is persisted
+    next to the vector store. Unchanged files are skipped without being read,
+    changed files have their old chunks replaced, and chunks of files that
+    disappeared are deleted.
     """
     # Resolve default data directory (repository root /data)
     if path is None:
@@ -50,49 +169,88 @@ async def hotload_data(path: Path = None):
         log_observability_event(datetime.utcnow(), "data_loader", "DataLoader", f"Data directory not found: {data_dir}")
         return
 
+    manifest = _load_manifest()
+    entries = manifest["files"]
+
     # Collect files
-    text_files = [p for p in data_dir.rglob("*") if p.suffix.lower() in {".txt", ".md", ".json", ".csv"}]
+    text_files = sorted(p for p in data_dir.rglob("*") if p.is_file() and p.suffix.lower() in DATA_SUFFIXES)
+    current_sources = {str(file.relative_to(data_dir)) for file in text_files}
+    hotload_progress.total_files = len(text_files)
+
+    # Drop chunks of files that were removed since the last load
+    for source in sorted(set(entries) - current_sources):
+        try:
+            await delete_document_embeddings(source)
+            del entries[source]
+            log_observability_event(datetime.utcnow(), "data_loader", "DataLoader", f"Removed chunks for deleted file {source}")
+        except Exception as e:
+            log_observability_event(datetime.utcnow(), "data_loader", "DataLoader", f"Failed to remove chunks for {source}: {e}")
+
     if not text_files:
+        _save_manifest(manifest)
         log_observability_event(datetime.utcnow(), "data_loader", "DataLoader", f"No data files found in {data_dir}")
         return
 
+    # Decide which files need (re)loading; unchanged files are skipped
+    pending = []
+    new_entries = {}
+    skipped = 0
     for file in text_files:
+        source = str(file.relative_to(data_dir))
         try:
-            content = file.read_text(encoding='utf-8')
-        except Exception as e:
-            log_observability_event(datetime.utcnow(), "data_loader", "DataLoader", f"Failed to read {file}: {e}")
-            continue
+            stat = file.stat()
+            entry = entries.get(source)
+            if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+                skipped += 1
+                hotload_progress.file_done("skipped")
+                continue
 
-        # For JSON files, try to compact to string
-        if file.suffix.lower() == ".json":
-            try:
-                import json
-                parsed = json.loads(content)
-                # if dict/list, stringify; else keep raw
-                if isinstance(parsed, (dict, list)):
-                    content = json.dumps(parsed)
-            except Exception:
-                pass
-
-        chunks = _chunk_text(content)
-        if not chunks:
-            continue
+            content_hash = await asyncio.to_thread(_file_hash, file)
+            if entry and entry["sha256"] == content_hash:
+                # Touched but not modified
+                entry["mtime"] = stat.st_mtime
+                skipped += 1
+                hotload_progress.file_done("skipped")
+                continue
 
-        # Compute embeddings in batches
-        try:
-            embeddings = await get_embeddings(chunks)
+            # Replace whatever was stored for this source, including chunks
+            # from loads that predate the manifest
+            await delete_document_embeddings(source)
         except Exception as e:
-            log_observability_event(datetime.utcnow(), "data_loader", "DataLoader", f"Embedding failed for {file}: {e}")
+            log_observability_event(datetime.utcnow(), "data_loader", "DataLoader", f"Failed to load {file}: {e}")
+            hotload_progress.file_done("failed")
             continue
 
-        # Build metadata per chunk
-        metadata = [{"source": str(file.relative_to(data_dir)), "filename": file.name} for _ in chunks]
+        document = IngestionDocument(
+            source=source,
+            chunks=lambda file=file: _iter_file_chunks(file),
+            metadata={"source": source, "filename": file.name},
+            id_prefix=_chunk_id_prefix(source, content_hash),
+        )
+        pending.append(document)
+        new_entries[source] = {"size": stat.st_size, "mtime": stat.st_mtime, "sha256": content_hash}
 
-        try:
-            await store_document_embeddings(chunks, embeddings, metadata)
-            log_observability_event(datetime.utcnow(), "data_loader", "DataLoader", f"Loaded {len(chunks)} chunks from {file.name}")
-        except Exception as e:
-            log_observability_event(datetime.utcnow(), "data_loader", "DataLoader", f"Failed to store embeddings for {file}: {e}")
+    loaded = 0
+
+    def on_complete(document: IngestionDocument):
+        nonlocal loaded
+        if document.error:
+            log_observability_event(datetime.utcnow(), "data_loader", "DataLoader", f"Failed to load {document.source}: {document.error}", level="error")
+            hotload_progress.file_done("failed")
+            return
+        loaded += 1
+        hotload_progress.file_done("loaded")
+        log_observability_event(datetime.utcnow(), "data_loader", "DataLoader", f"Loaded {document.chunk_count} chunks from {document.source}")
+        if not document.fully_embedded:
+            # Leave it out of the manifest so the next load embeds it again
+            entries.pop(document.source, None)
+            return
+        entries[document.source] = {**new_entries[document.source], "chunks": document.chunk_count}
+
+    await IngestionPipeline().run(pending, on_complete=on_complete)
+
+    _save_manifest(manifest)
+    log_observability_event(datetime.utcnow(), "data_loader", "DataLoader", f"Hotload finished: {loaded} files loaded, {skipped} unchanged")
 
 
 def load_data_sync(path: str = None):
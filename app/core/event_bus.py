@@ -0,0 +1,141 @@
+import asyncio
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+from app.config import settings
+
+# Event types that end an execution's stream
+TERMINAL_EVENTS = {"execution_completed", "execution_failed"}
+
+
+class Subscription:
+    """One stream's view of an execution: an asyncio queue fed by the bus."""
+
+    def __init__(self, execution_id: str, loop: asyncio.AbstractEventLoop, max_size: int):
+        self.execution_id = execution_id
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(max_size)
+        # Set when the consumer fell behind and events were skipped
+        self.overflowed = False
+
+    def _deliver(self, event: Dict[str, Any]):
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self, timeout: float = None) -> Optional[Dict[str, Any]]:
+        """Next event, or None on timeout."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventBus:
+    """In-process pub/sub for execution events.
+
+    Publishers (the orchestrator, via log_observability_event) push events
+    per execution; SSE streams subscribe instead of polling the database.
+    Every event carries a monotonically increasing "id" (see
+    sqlite_client.next_event_id) that streams use to resume.
+    The bus keeps the last `history_size` events of the last
+    `max_executions` executions so a stream opened after (or while) an
+    execution runs still sees what happened. `publish` may be called from
+    any thread.
+    """
+
+    def __init__(self, history_size: int = 500, max_executions: int = 1000, subscriber_queue_size: int = 1000):
+        self.history_size = history_size
+        self.max_executions = max_executions
+        self.subscriber_queue_size = subscriber_queue_size
+        self._lock = threading.Lock()
+        self._history: "OrderedDict[str, Deque[Dict[str, Any]]]" = OrderedDict()
+        # Id of the newest event pushed out of each execution's history
+        self._truncated: Dict[str, int] = {}
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self.stats = {"published": 0, "delivered": 0, "overflows": 0}
+
+    def publish(self, execution_id: str, event: Dict[str, Any]):
+        if not execution_id:
+            return
+        with self._lock:
+            history = self._get_or_create_history(execution_id)
+            if len(history) == history.maxlen:
+                self._truncated[execution_id] = history[0]["id"]
+            history.append(event)
+            subscribers = list(self._subscribers.get(execution_id, ()))
+            self.stats["published"] += 1
+
+        for subscription in subscribers:
+            self.stats["delivered"] += 1
+            try:
+                running = asyncio.get_running_loop()
+            except RuntimeError:
+                running = None
+            if running is subscription.loop:
+                subscription._deliver(event)
+            else:
+                subscription.loop.call_soon_threadsafe(subscription._deliver, event)
+
+    def open(self, execution_id: str):
+        """Register an execution before its first event, so streams opened
+        early wait for events instead of falling back to the database."""
+        with self._lock:
+            self._get_or_create_history(execution_id)
+
+    def subscribe(self, execution_id: str, after_id: int = 0) -> Tuple[Optional[List[Dict[str, Any]]], Subscription]:
+        """Register a subscriber and return (history, subscription) atomically.
+
+        History holds the events with ids above `after_id`. It is None if the
+        bus can't provide all of them: it has never seen the execution (e.g.
+        after a restart), has evicted it, or has dropped events after
+        `after_id` from its bounded history. Callers then read the database.
+        """
+        subscription = Subscription(execution_id, asyncio.get_running_loop(), self.subscriber_queue_size)
+        with self._lock:
+            self._subscribers.setdefault(execution_id, set()).add(subscription)
+            history = self._history.get(execution_id)
+            if history is None or self._truncated.get(execution_id, 0) > after_id:
+                return None, subscription
+            return [event for event in history if event["id"] > after_id], subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.execution_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.execution_id]
+        if subscription.overflowed:
+            self.stats["overflows"] += 1
+
+    def _get_or_create_history(self, execution_id: str) -> Deque[Dict[str, Any]]:
+        history = self._history.get(execution_id)
+        if history is None:
+            history = self._history[execution_id] = deque(maxlen=self.history_size)
+            # Forget the oldest executions nobody is watching
+            for oldest in list(self._history):
+                if len(self._history) <= self.max_executions:
+                    break
+                if oldest not in self._subscribers:
+                    del self._history[oldest]
+                    self._truncated.pop(oldest, None)
+        return history
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats,
+                "executions": len(self._history),
+                "subscribers": sum(len(subscribers) for subscribers in self._subscribers.values()),
+            }
+
+
+# Global instance
+event_bus = EventBus(
+    history_size=settings.event_bus_history_size,
+    max_executions=settings.event_bus_max_executions,
+)
@@ -0,0 +1,185 @@
+import asyncio
+import uuid
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from app.config import settings
+from app.db.chroma_client import store_document_embeddings
+from app.utils.embeddings import get_embeddings
+
+# Marks the end of a queue; each consumer worker receives one
+_DONE = object()
+
+
+class IngestionDocument:
+    """One document to ingest.
+
+    `chunks` is a callable returning an iterator of (chunk, start, end)
+    tuples, usually a streaming chunker over a file (see app.utils.chunking).
+    It may block on I/O; it is consumed in a worker thread one embedding
+    batch at a time, so large files are never fully in memory. The iterator
+    is closed when reading stops, even early on an error, so a generator
+    releases its file or connection. Chunk ids are `{id_prefix}_{index}`,
+    so a stable prefix makes re-ingestion idempotent.
+    """
+
+    def __init__(self, source: str, chunks: Callable[[], Iterator[Tuple[str, int, int]]], metadata: Dict[str, Any] = None, id_prefix: str = None):
+        self.source = source
+        self.chunks = chunks
+        self.metadata = metadata or {}
+        self.id_prefix = id_prefix or f"doc_{uuid.uuid4()}"
+        # Filled in as the document moves through the pipeline
+        self.chunk_count = 0
+        self.total_batches: Optional[int] = None
+        self.stored_batches = 0
+        self.fully_embedded = True
+        self.error: Optional[str] = None
+        self.finished = False
+
+    def result(self) -> Dict[str, Any]:
+        return {
+            "source": self.source,
+            "chunks": self.chunk_count,
+            "fully_embedded": self.fully_embedded,
+            "error": self.error,
+        }
+
+
+class IngestionPipeline:
+    """Bounded-concurrency ingestion pipeline shared by the data loader and IngestionAgent.
+
+    Stages run concurrently and are connected by bounded queues, so a slow
+    stage applies backpressure upstream instead of buffering whole corpora:
+
+        read + chunk (threads, streaming) -> embed (batched) -> store (batched upserts)
+
+    Embedding batches from different documents are combined into a single
+    Chroma upsert when they are ready at the same time.
+    """
+
+    def __init__(self, read_workers: int = None, embed_workers: int = None, embed_batch_size: int = None, store_batch_size: int = None, queue_size: int = None):
+        self.read_workers = read_workers or settings.ingestion_read_workers
+        self.embed_workers = embed_workers or settings.ingestion_embed_workers
+        self.embed_batch_size = embed_batch_size or settings.ingestion_embed_batch_size
+        self.store_batch_size = store_batch_size or settings.ingestion_store_batch_size
+        self.queue_size = queue_size or settings.ingestion_queue_size
+
+    async def run(self, documents: Iterable[IngestionDocument], on_complete: Callable[[IngestionDocument], None] = None) -> List[Dict[str, Any]]:
+        """Ingest documents and return one result per document, in input order.
+
+        `on_complete` is called as each document finishes, successfully or not.
+        """
+        documents = list(documents)
+        read_queue = asyncio.Queue(self.queue_size)
+        embed_queue = asyncio.Queue(self.queue_size)
+        store_queue = asyncio.Queue(self.queue_size)
+
+        def finish(doc: IngestionDocument):
+            if not doc.finished:
+                doc.finished = True
+                if on_complete:
+                    on_complete(doc)
+
+        async def feed():
+            for doc in documents:
+                await read_queue.put(doc)
+            for _ in range(self.read_workers):
+                await read_queue.put(_DONE)
+
+        async def read_worker():
+            while (doc := await read_queue.get()) is not _DONE:
+                batches = 0
+                chunk_iter = None
+                try:
+                    chunk_iter = await asyncio.to_thread(doc.chunks)
+                    while batch := await asyncio.to_thread(self._next_batch, chunk_iter):
+                        if doc.error:
+                            break
+                        await embed_queue.put((doc, doc.chunk_count, batch))
+                        doc.chunk_count += len(batch)
+                        batches += 1
+                except Exception as e:
+                    doc.error = f"read failed: {e}"
+                finally:
+                    if hasattr(chunk_iter, "close"):
+                        # Runs the generator's cleanup, which may block (e.g. closing a download)
+                        await asyncio.to_thread(chunk_iter.close)
+                if doc.error:
+                    finish(doc)
+                    continue
+                doc.total_batches = batches
+                if doc.stored_batches == doc.total_batches:
+                    finish(doc)
+
+        async def embed_worker():
+            while (item := await embed_queue.get()) is not _DONE:
+                doc, start, batch = item
+                if doc.error:
+                    continue
+                chunks = [chunk for chunk, _, _ in batch]
+                try:
+                    embeddings = await get_embeddings(chunks)
+                except Exception as e:
+                    doc.error = f"embedding failed: {e}"
+                    finish(doc)
+                    continue
+                # Failed embeddings come back as zero vectors
+                if not all(any(embedding) for embedding in embeddings):
+                    doc.fully_embedded = False
+                await store_queue.put((doc, start, batch, embeddings))
+
+        async def store_worker():
+            done = False
+            while not done:
+                batch = [await store_queue.get()]
+                # Combine whatever else is already waiting into the same upsert
+                while batch[-1] is not _DONE and len(batch) < self.store_batch_size and not store_queue.empty():
+                    batch.append(store_queue.get_nowait())
+                if batch[-1] is _DONE:
+                    done = True
+                    batch.pop()
+                await self._store(batch, finish)
+
+        async def run_stage(workers: int, worker, next_queue: Optional[asyncio.Queue], next_workers: int):
+            await asyncio.gather(*(worker() for _ in range(workers)))
+            for _ in range(next_workers):
+                await next_queue.put(_DONE)
+
+        await asyncio.gather(
+            feed(),
+            run_stage(self.read_workers, read_worker, embed_queue, self.embed_workers),
+            run_stage(self.embed_workers, embed_worker, store_queue, 1),
+            store_worker(),
+        )
+        return [doc.result() for doc in documents]
+
+    def _next_batch(self, chunk_iter: Iterator[Tuple[str, int, int]]) -> List[Tuple[str, int, int]]:
+        """Pull up to one embedding batch of chunks (blocking)."""
+        batch = []
+        for item in chunk_iter:
+            batch.append(item)
+            if len(batch) >= self.embed_batch_size:
+                break
+        return batch
+
+    async def _store(self, batch: List[tuple], finish: Callable[[IngestionDocument], None]):
+        batch = [item for item in batch if not item[0].error]
+        if not batch:
+            return
+        ids, chunks, embeddings, metadata = [], [], [], []
+        for doc, start, doc_chunks, doc_embeddings in batch:
+            ids.extend(f"{doc.id_prefix}_{start + i}" for i in range(len(doc_chunks)))
+            chunks.extend(chunk for chunk, _, _ in doc_chunks)
+            embeddings.extend(doc_embeddings)
+            metadata.extend({**doc.metadata, "start_offset": chunk_start, "end_offset": chunk_end} for _, chunk_start, chunk_end in doc_chunks)
+        try:
+            await store_document_embeddings(chunks, embeddings, metadata, ids=ids)
+        except Exception as e:
+            for doc, *_ in batch:
+                if not doc.error:
+                    doc.error = f"store failed: {e}"
+                    finish(doc)
+            return
+        for doc, *_ in batch:
+            doc.stored_batches += 1
+            # total_batches stays None until the reader has drained the document
+            if doc.stored_batches == doc.total_batches:
+                finish(doc)
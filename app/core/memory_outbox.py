@@ -0,0 +1,136 @@
+import asyncio
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from app.agents.memory_agent import MemoryAgent
+from app.config import settings
+from app.db.sqlite_client import (
+    add_pending_memories, get_pending_memories, delete_pending_memories,
+    record_pending_memory_failure, get_pending_memory_stats,
+)
+
+# Items are given up on (and kept in the table for inspection) after this many failed writes
+MAX_ATTEMPTS = 5
+# Pause after a failed batch before trying again
+RETRY_INTERVAL = 5.0
+
+
+class MemoryOutbox:
+    """Write-behind persistence for memories.
+
+    `enqueue` commits memories to the memory_outbox table, a single small
+    SQLite write, and returns; a background task then writes them through
+    MemoryAgent.write_memories (embedding, SQLite and ChromaDB) in batches
+    of up to `batch_size`, waiting `flush_interval_ms` for a batch to fill.
+    Outbox rows are deleted only after the write, and their id becomes the
+    memory id, so rows left behind by a crash or restart are written on the
+    next start without creating duplicates.
+    """
+
+    def __init__(self, batch_size: int, flush_interval_ms: float, memory_agent: MemoryAgent = None):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.memory_agent = memory_agent or MemoryAgent()
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._closing = False
+        self.stats = {"enqueued": 0, "written": 0, "batches": 0, "failed_batches": 0, "last_lag_ms": 0.0, "max_lag_ms": 0.0}
+
+    def start(self):
+        """Start the worker; it first writes anything left in the outbox.
+
+        The worker and its wake-up event belong to the running loop, so they
+        are recreated if the worker has stopped or a different loop calls
+        (e.g. a second asyncio.run or a new TestClient).
+        """
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._closing = False
+            self._wake = asyncio.Event()
+            self._wake.set()
+            self._task = loop.create_task(self._run())
+
+    async def enqueue(self, memories: List[Dict[str, Any]]) -> List[str]:
+        """Durably queue memories ("content", "type", optional "source"); returns their ids."""
+        if not memories:
+            return []
+        items = [{"id": str(uuid.uuid4()), "source": None, **memory} for memory in memories]
+        await add_pending_memories(items)
+        self.stats["enqueued"] += len(items)
+        self.start()
+        self._wake.set()
+        return [item["id"] for item in items]
+
+    async def close(self, timeout: float = 5.0):
+        """Write what is queued (within `timeout`) and stop the worker.
+
+        Anything not written stays in the outbox for the next start.
+        """
+        if self._task is None or self._task.get_loop() is not asyncio.get_running_loop():
+            self._task = None
+            return
+        self._closing = True
+        self._wake.set()
+        try:
+            await asyncio.wait_for(self._task, timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._task = None
+
+    async def get_stats(self) -> Dict[str, Any]:
+        outbox = await get_pending_memory_stats(MAX_ATTEMPTS)
+        oldest = outbox.pop("oldest_created_at")
+        # How long the oldest queued memory has been waiting
+        lag = (datetime.utcnow() - oldest).total_seconds() * 1000 if oldest else 0.0
+        return {**self.stats, **outbox, "lag_ms": round(lag, 1)}
+
+    async def _run(self):
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            if not self._closing:
+                # Let memories from concurrent requests join the batch
+                await asyncio.sleep(self.flush_interval)
+            while await self._write_batch():
+                pass
+            # Checked after writing, so a close before the first pass still writes the queue
+            if self._closing:
+                return
+
+    async def _write_batch(self) -> bool:
+        """Write the oldest batch; returns whether there may be more to write."""
+        try:
+            batch = await get_pending_memories(self.batch_size, MAX_ATTEMPTS)
+        except Exception as e:
+            print(f"Warning: Failed to read memory outbox: {e}")
+            return False
+        if not batch:
+            return False
+        ids = [item["id"] for item in batch]
+        try:
+            await self.memory_agent.write_memories(batch)
+            await delete_pending_memories(ids)
+        except Exception as e:
+            self.stats["failed_batches"] += 1
+            print(f"Warning: Failed to write {len(batch)} queued memories: {e}")
+            try:
+                await record_pending_memory_failure(ids, str(e))
+            except Exception:
+                pass
+            if not self._closing:
+                await asyncio.sleep(RETRY_INTERVAL)
+            return not self._closing
+        now = datetime.utcnow()
+        lag = max((now - item["created_at"]).total_seconds() * 1000 for item in batch)
+        self.stats["batches"] += 1
+        self.stats["written"] += len(batch)
+        self.stats["last_lag_ms"] = round(lag, 1)
+        self.stats["max_lag_ms"] = max(self.stats["max_lag_ms"], round(lag, 1))
+        return len(batch) == self.batch_size
+
+
+# Global instance
+memory_outbox = MemoryOutbox(
+    batch_size=settings.memory_outbox_batch_size,
+    flush_interval_ms=settings.memory_outbox_flush_interval_ms,
+)
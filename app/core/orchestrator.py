@@ -1,15 +1,29 @@
 import uuid
+import time
 import inspect
-from typing import Dict, Any, TypedDict
+from typing import Annotated, Dict, Any, List, Optional, Tuple, TypedDict, Union
 from datetime import datetime
 from langgraph.graph import StateGraph, END
-from app.agents.guardrail_agent import GuardrailAgent
+from app.agents.guardrail_agent import GuardrailAgent, StreamingOutputGuardrail, SAFETY_MESSAGE
 from app.agents.retrieval_agent import RetrievalAgent
 from app.agents.memory_agent import MemoryAgent
-from app.db.sqlite_client import create_execution, update_execution_status, log_observability_event
-import openai
+from app.utils.embeddings import get_embedding
+from app.db.sqlite_client import create_execution, update_execution_status, log_observability_event, next_event_id
+from app.db.chroma_client import get_documents_version
+from app.utils.response_cache import response_cache
+from app.core.event_bus import event_bus
+from app.core.memory_outbox import memory_outbox
+from app.utils.llm_gateway import llm_gateway
 from app.config import settings
 
+def _merge_timings(left: Dict[str, float], right: Dict[str, float]) -> Dict[str, float]:
+    """Merge per-node timings; node names are unique so the order of writes doesn't matter."""
+    return {**(left or {}), **(right or {})}
+
+def _merge_degraded(left: List[str], right: List[str]) -> List[str]:
+    """Union of the upstreams that fell back, so concurrent nodes can each add theirs."""
+    return sorted(set(left or []) | set(right or []))
+
 class OrchestratorState(TypedDict):
     query: str
     execution_id: str
@@ -26,49 +40,127 @@ class OrchestratorState(TypedDict):
     retrieved_memory: Any
     reasoning_summary: str
     correlated_memories: list
+    # Embedding of masked_query, computed once per execution and shared by every stage
+    query_embedding: List[float]
+    # Publish generated tokens to the event bus as they arrive
+    stream: bool
+    # Seconds spent in each node; the reducer lets concurrent nodes write it in the same step
+    node_timings: Annotated[Dict[str, float], _merge_timings]
+    # Upstreams ("chat", "embeddings") that failed or had an open circuit
+    # breaker, so the response came from a fallback
+    degraded: Annotated[List[str], _merge_degraded]
+
+# Pipeline variants per query mode, as the ordered list of stages to run.
+# A stage is a node name, or a tuple of independent nodes that run
+# concurrently and are joined before the next stage.
+# Modes without an entry fall back to DEFAULT_MODE.
+DEFAULT_MODE = "chat"
+PIPELINE_VARIANTS: Dict[str, List[Union[str, Tuple[str, ...]]]] = {
+    "chat": [
+        "input_guardrail", "embed_query", ("retrieval", "memory_correlation"), "reasoning",
+        "generation", "output_guardrail", "memory_persistence",
+    ],
+    # Lookups: answer from documents and memory without learning new
+    # semantic or episodic memories (the conversation turn is still stored)
+    "self-service": [
+        "input_guardrail", "embed_query", ("retrieval", "memory_correlation"), "reasoning",
+        "generation", "output_guardrail",
+    ],
+    "incident": [
+        "input_guardrail", "embed_query", ("retrieval", "memory_correlation"), "reasoning",
+        "generation", "output_guardrail", "memory_persistence",
+    ],
+}
 
 class Orchestrator:
     def __init__(self):
-        self.graph = self._build_graph()
-        openai.api_key = settings.openai_api_key
-
-    def _build_graph(self) -> StateGraph:
-        """Build the LangGraph workflow."""
+        self.nodes = {
+            "input_guardrail": self._input_guardrail,
+            "embed_query": self._embed_query,
+            "retrieval": self._retrieval,
+            "memory_correlation": self._memory_correlation,
+            "reasoning": self._reasoning,
+            "generation": self._generation,
+            "memory_persistence": self._memory_persistence,
+            "output_guardrail": self._output_guardrail,
+        }
+        # Build and compile every variant once; run_query only looks them up
+        self.graphs = {
+            mode: self._build_graph(stages).compile()
+            for mode, stages in PIPELINE_VARIANTS.items()
+        }
+
+    def _build_graph(self, stages: List[Union[str, Tuple[str, ...]]]) -> StateGraph:
+        """Build the LangGraph workflow for an ordered list of stages.
+
+        The first and last stages must be single nodes. A multi-node stage fans
+        out from the previous stage and joins into the next one.
+        """
         graph = StateGraph(OrchestratorState)
-
-        # Add nodes
-        graph.add_node("input_guardrail", self._input_guardrail)
-        graph.add_node("retrieval", self._retrieval)
-        graph.add_node("memory_correlation", self._memory_correlation)
-        graph.add_node("reasoning", self._reasoning)
-        graph.add_node("generation", self._generation)
-        graph.add_node("memory_persistence", self._memory_persistence)
-        graph.add_node("output_guardrail", self._output_guardrail)
-
-        # Define edges
-        graph.set_entry_point("input_guardrail")
-        graph.add_edge("input_guardrail", "retrieval")
-        graph.add_edge("retrieval", "memory_correlation")
-        graph.add_edge("memory_correlation", "reasoning")
-        graph.add_edge("reasoning", "generation")
-        graph.add_edge("generation", "memory_persistence")
-        graph.add_edge("memory_persistence", "output_guardrail")
-        graph.add_edge("output_guardrail", END)
+        stages = [(stage,) if isinstance(stage, str) else tuple(stage) for stage in stages]
+
+        for stage in stages:
+            for name in stage:
+                graph.add_node(name, self._timed(name, self.nodes[name]))
+
+        graph.set_entry_point(stages[0][0])
+        for current, following in zip(stages, stages[1:]):
+            for name in following:
+                if len(current) == 1:
+                    graph.add_edge(current[0], name)
+                else:
+                    # Wait for every node of the current stage before continuing
+                    graph.add_edge(list(current), name)
+        graph.add_edge(stages[-1][0], END)
 
         return graph
 
-    async def run_query(self, query: str, attachments: list, mode: str) -> Dict[str, Any]:
-        """Run the orchestration workflow asynchronously."""
-        execution_id = str(uuid.uuid4())
-        conversation_id = str(uuid.uuid4())
-
-        # Create execution record (Sync DB call is fine here)
-        create_execution(execution_id=execution_id, conversation_id=conversation_id, query=query)
+    def _timed(self, name: str, node):
+        """Wrap a node so its update also records how long it took."""
+        async def run(state: OrchestratorState) -> Dict[str, Any]:
+            started = time.perf_counter()
+            updates = await node(state)
+            return {**updates, "node_timings": {name: time.perf_counter() - started}}
+        return run
+
+    def get_graph(self, mode: str):
+        """Return the compiled graph for a mode, defaulting to the chat pipeline."""
+        return self.graphs.get(mode) or self.graphs[DEFAULT_MODE]
+
+    async def run_query(self, query: str, attachments: list, mode: str, execution_id: str = None, conversation_id: str = None, stream: bool = False) -> Dict[str, Any]:
+        """Run the orchestration workflow asynchronously.
+
+        Callers that hand out the ids before the run starts (e.g. to open a
+        stream) can pass them in. With `stream`, generated tokens are
+        published as "token" events while the response is produced.
+        In the cached modes (incident by default), near-duplicates of recent
+        queries are answered from the response cache without running the
+        pipeline; the turn is still stored as a conversation memory.
+        """
+        execution_id = execution_id or str(uuid.uuid4())
+        conversation_id = conversation_id or str(uuid.uuid4())
+
+        # Create execution record
+        await create_execution(execution_id=execution_id, conversation_id=conversation_id, query=query)
 
         # Log start
         log_observability_event(datetime.utcnow(), "agent_started", "Orchestrator", "Starting orchestration", execution_id=execution_id)
 
         try:
+            # Read before answering, so an answer generated while documents
+            # were being ingested is not cached
+            documents_version = get_documents_version()
+            cached_response, cache_embedding = await self._lookup_response_cache(query, mode, execution_id, documents_version)
+            if cached_response is not None:
+                await update_execution_status(execution_id, "completed", cached_response)
+                event_bus.publish(execution_id, {"id": next_event_id(), "event": "execution_completed", "status": "completed", "final_response": cached_response})
+                await self._remember_conversation(query, cached_response, execution_id)
+                return {
+                    "conversation_id": conversation_id,
+                    "execution_id": execution_id,
+                    "result": {"final_response": cached_response, "cached": True}
+                }
+
             # Prepare initial state with defaults for all keys
             initial_state: OrchestratorState = {
                 "query": query,
@@ -84,15 +176,28 @@ class Orchestrator:
                 "retrieved_docs": {},
                 "retrieved_memory": {},
                 "reasoning_summary": "",
-                "correlated_memories": []
+                "correlated_memories": [],
+                "query_embedding": [],
+                "stream": stream,
+                "node_timings": {},
+                "degraded": []
             }
 
             # FIX 1: Use ainvoke (Async Invoke) and await it
             # This ensures 'result' is a Dictionary, not a Coroutine
-            result = await self.graph.compile().ainvoke(initial_state)
+            result = await self.get_graph(mode).ainvoke(initial_state)
 
             # Update execution status
-            update_execution_status(execution_id, "completed", result.get("final_response") if isinstance(result, dict) else None)
+            final_response = result.get("final_response") if isinstance(result, dict) else None
+            degraded = result.get("degraded", []) if isinstance(result, dict) else []
+            if degraded:
+                log_observability_event(datetime.utcnow(), "degraded_mode", "Orchestrator", f"Answered with fallbacks for: {', '.join(degraded)}", execution_id=execution_id)
+            # Fallback answers are not cached, so they stop once the upstream recovers
+            elif cache_embedding is not None and final_response and final_response != SAFETY_MESSAGE:
+                response_cache.put(mode, query, cache_embedding, final_response, documents_version)
+            await update_execution_status(execution_id, "completed", final_response, degraded=degraded)
+            event_bus.publish(execution_id, {"id": next_event_id(), "event": "execution_completed", "status": "completed", "final_response": final_response, "degraded": degraded})
+            await self._remember_conversation(query, final_response, execution_id)
 
             return {
                 "conversation_id": conversation_id,
@@ -102,12 +207,55 @@ class Orchestrator:
 
         except Exception as e:
             # Capture errors
-            update_execution_status(execution_id, "failed", str(e))
+            await update_execution_status(execution_id, "failed", str(e))
+            event_bus.publish(execution_id, {"id": next_event_id(), "event": "execution_failed", "status": "failed", "final_response": str(e)})
             raise e
 
-    # FIX 2: All nodes must be 'async def' to handle async agents properly
+    async def _remember_conversation(self, query: str, response: str, execution_id: str):
+        """Queue the turn as a conversation memory, in every mode, so future queries can recall what the user told us."""
+        if not query or not response:
+            return
+        try:
+            await memory_outbox.enqueue([{
+                "content": f"User: {query}\nAssistant: {response}",
+                "type": "conversation",
+                "source": "chat_interaction"
+            }])
+        except Exception as e:
+            log_observability_event(datetime.utcnow(), "agent_error", "MemoryAgent", f"Failed to store conversation memory: {str(e)}", level="error", execution_id=execution_id)
+
+    async def _lookup_response_cache(self, query: str, mode: str, execution_id: str, documents_version: int) -> Tuple[Optional[str], Optional[List[float]]]:
+        """Return (cached response, None) on a hit, or (None, embedding to cache the new response under).
+
+        Only queries of the cached modes that pass input validation unchanged
+        use the cache, so a cached answer never skips a guardrail the
+        pipeline would apply.
+        """
+        if not settings.response_cache_enabled or mode not in settings.response_cache_modes:
+            return None, None
+        if not GuardrailAgent().validate_input(query)["valid"]:
+            return None, None
+        try:
+            # The same text as embed_query's, so that node reuses this vector from the embedding cache
+            query_embedding = await get_embedding(query)
+        except Exception as e:
+            print(f"Warning: Response cache lookup skipped: {e}")
+            return None, None
+        if not query_embedding or not any(query_embedding):
+            return None, None
+
+        hit = response_cache.get(mode, query_embedding, documents_version)
+        if hit:
+            log_observability_event(datetime.utcnow(), "cache_hit", "ResponseCache", f"Answered from cache (similarity {hit['similarity']:.3f} to \"{hit['query'][:80]}\")", execution_id=execution_id)
+            return hit["response"], None
+        log_observability_event(datetime.utcnow(), "cache_miss", "ResponseCache", "No cached response for a similar query", execution_id=execution_id)
+        return None, query_embedding
+
+    # FIX 2: All nodes must be 'async def' to handle async agents properly.
+    # Nodes return only the state keys they write, so nodes that run in the
+    # same stage never write the same key and the merged state is deterministic.
     
-    async def _input_guardrail(self, state: OrchestratorState) -> OrchestratorState:
+    async def _input_guardrail(self, state: OrchestratorState) -> Dict[str, Any]:
         execution_id = state["execution_id"]
         query = state["query"]
         log_observability_event(datetime.utcnow(), "agent_started", "GuardrailAgent", "Validating input", execution_id=execution_id)
@@ -123,11 +271,25 @@ class Orchestrator:
         if not validation["valid"]:
             raise ValueError(f"Input validation failed: {validation['issues']}")
 
-        state["masked_query"] = validation["masked_content"]
         log_observability_event(datetime.utcnow(), "agent_completed", "GuardrailAgent", "Input validation completed", execution_id=execution_id)
-        return state
+        return {"masked_query": validation["masked_content"]}
+
+    async def _embed_query(self, state: OrchestratorState) -> Dict[str, Any]:
+        """Embed the masked query once so retrieval and memory search can share the vector."""
+        execution_id = state["execution_id"]
+        query = state.get("masked_query", state.get("query"))
+        log_observability_event(datetime.utcnow(), "agent_started", "EmbeddingService", "Embedding query", execution_id=execution_id)
+
+        query_embedding = await get_embedding(query)
+
+        if not any(query_embedding):
+            # Embedding failed (zero vector); retrieval and memory search use keyword search
+            log_observability_event(datetime.utcnow(), "agent_completed", "EmbeddingService", "Query embedding unavailable, using keyword search", execution_id=execution_id)
+            return {"query_embedding": query_embedding, "degraded": ["embeddings"]}
+        log_observability_event(datetime.utcnow(), "agent_completed", "EmbeddingService", "Query embedding ready", execution_id=execution_id)
+        return {"query_embedding": query_embedding}
 
-    async def _retrieval(self, state: OrchestratorState) -> OrchestratorState:
+    async def _retrieval(self, state: OrchestratorState) -> Dict[str, Any]:
         execution_id = state["execution_id"]
         query = state.get("masked_query", state.get("query"))
         log_observability_event(datetime.utcnow(), "agent_started", "RetrievalAgent", "Retrieving documents", execution_id=execution_id)
@@ -135,18 +297,19 @@ class Orchestrator:
         retrieval = RetrievalAgent(execution_id)
         
         # FIX 3: Await the retrieval agent (since it uses async DB)
+        query_embedding = state.get("query_embedding") or None
         if inspect.iscoroutinefunction(retrieval.retrieve):
-            results = await retrieval.retrieve(query)
+            results = await retrieval.retrieve(query, query_embedding=query_embedding)
         else:
-            results = retrieval.retrieve(query)
-
-        state["retrieved_docs"] = results.get("documents", {})
-        state["retrieved_memory"] = results.get("memory", {})
+            results = retrieval.retrieve(query, query_embedding=query_embedding)
 
         log_observability_event(datetime.utcnow(), "agent_completed", "RetrievalAgent", "Retrieval completed", execution_id=execution_id)
-        return state
+        return {
+            "retrieved_docs": results.get("documents", {}),
+            "retrieved_memory": results.get("memory", {}),
+        }
 
-    async def _memory_correlation(self, state: OrchestratorState) -> OrchestratorState:
+    async def _memory_correlation(self, state: OrchestratorState) -> Dict[str, Any]:
         """Read and correlate past memories with retrieved documents."""
         execution_id = state["execution_id"]
         query = state.get("masked_query", state.get("query"))
@@ -157,14 +320,14 @@ class Orchestrator:
         
         # Read memories related to the query using semantic search
         # This will return episodic, semantic, AND conversation memories
-        correlated_memories = await memory_agent.read_memory(query=query, top_k=5)
-        
-        state["correlated_memories"] = correlated_memories
+        correlated_memories = await memory_agent.read_memory(
+            query=query, top_k=5, query_embedding=state.get("query_embedding") or None
+        )
         
         log_observability_event(datetime.utcnow(), "agent_completed", "MemoryAgent", f"Correlated {len(correlated_memories)} memories", execution_id=execution_id)
-        return state
+        return {"correlated_memories": correlated_memories}
 
-    async def _reasoning(self, state: OrchestratorState) -> OrchestratorState:
+    async def _reasoning(self, state: OrchestratorState) -> Dict[str, Any]:
         execution_id = state["execution_id"]
         query = state.get("masked_query", state.get("query"))
         docs = state.get("retrieved_docs", {})
@@ -193,19 +356,18 @@ Please provide a brief reasoning summary. Consider:
 
 Provide your reasoning based on ALL available context, including past conversation history."""
 
-        # Use async OpenAI call if available, or wrap in executor if blocking
+        degraded = []
         try:
-             # Try async call (OpenAI v1+)
-             client = openai.AsyncOpenAI(api_key=settings.openai_api_key)
-             response = await client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": reasoning_prompt}],
+             response = await llm_gateway.chat(
+                "gpt-3.5-turbo",
+                [{"role": "user", "content": reasoning_prompt}],
                 max_tokens=300
              )
-             state["reasoning_summary"] = response.choices[0].message.content
+             reasoning_summary = response.choices[0].message.content
         except (AttributeError, Exception) as e:
              # Fallback: simple reasoning from context if LLM fails
              print(f"LLM reasoning failed ({e}), using context-based fallback")
+             degraded = ["chat"]
              
              # Extract key info from context
              docs = state.get("retrieved_docs", {})
@@ -213,14 +375,14 @@ Provide your reasoning based on ALL available context, including past conversati
              
              if docs_list:
                  context_summary = " ".join([doc[:100] if doc else "" for doc in docs_list[:3]])
-                 state["reasoning_summary"] = f"Based on retrieved information: {context_summary}"
+                 reasoning_summary = f"Based on retrieved information: {context_summary}"
              else:
-                 state["reasoning_summary"] = "The query was received and processed."
+                 reasoning_summary = "The query was received and processed."
 
         log_observability_event(datetime.utcnow(), "agent_completed", "ReasoningAgent", "Reasoning completed", execution_id=execution_id)
-        return state
+        return {"reasoning_summary": reasoning_summary, "degraded": degraded}
 
-    async def _generation(self, state: OrchestratorState) -> OrchestratorState:
+    async def _generation(self, state: OrchestratorState) -> Dict[str, Any]:
         execution_id = state["execution_id"]
         query = state.get("masked_query", state.get("query"))
         reasoning = state.get("reasoning_summary", "")
@@ -260,17 +422,21 @@ IMPORTANT GUIDELINES:
 - Be natural and conversational
 - If the user has told you information about themselves (like their name), use it naturally in the response"""
 
+        degraded = []
         try:
-             client = openai.AsyncOpenAI(api_key=settings.openai_api_key)
-             response = await client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": generation_prompt}],
-                max_tokens=max_tokens
-             )
-             final_response = response.choices[0].message.content
+             if state.get("stream"):
+                 final_response = await self._stream_generation(generation_prompt, max_tokens, execution_id)
+             else:
+                 response = await llm_gateway.chat(
+                    "gpt-3.5-turbo",
+                    [{"role": "user", "content": generation_prompt}],
+                    max_tokens=max_tokens
+                 )
+                 final_response = response.choices[0].message.content
         except (AttributeError, Exception) as e:
             # Fallback: generate response from retrieved documents if LLM fails
             print(f"LLM generation failed ({e}), using document-based fallback")
+            degraded = ["chat"]
             
             # Extract relevant info from retrieved documents
             docs_list = retrieved_docs.get('documents', [[]])[0] if retrieved_docs.get('documents') else []
@@ -284,13 +450,60 @@ IMPORTANT GUIDELINES:
 
         # Clean up response: remove placeholder patterns and excessive formatting
         final_response = self._cleanup_response(final_response)
-        state["final_response"] = final_response
 
         log_observability_event(datetime.utcnow(), "agent_completed", "GeneratorAgent", "Response generation completed", execution_id=execution_id)
-        return state
-
-    async def _memory_persistence(self, state: OrchestratorState) -> OrchestratorState:
-        """Store insights and learnings from the interaction as memories."""
+        return {"final_response": final_response, "degraded": degraded}
+
+    async def _stream_generation(self, prompt: str, max_tokens: int, execution_id: str) -> str:
+        """Generate with stream=True, publishing each delta as a "token" event.
+
+        Tokens go to live streams only, after passing the streaming output
+        guardrail; the complete, cleaned-up response is still delivered with
+        the completion event. If the stream fails midway, a "stream_reset"
+        event tells clients to drop the tokens shown so far before the
+        error reaches the caller's fallback.
+        """
+        # Tokens are checked before release and the stream is cut off on a violation
+        guardrail = StreamingOutputGuardrail()
+        parts = []
+        published = False
+        try:
+            async with llm_gateway.stream_chat("gpt-3.5-turbo", [{"role": "user", "content": prompt}], max_tokens=max_tokens) as response:
+                async for chunk in response:
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if not delta:
+                        continue
+                    parts.append(delta)
+                    released = guardrail.feed(delta)
+                    if guardrail.blocked:
+                        # Leaving the block closes the connection
+                        break
+                    if released:
+                        event_bus.publish(execution_id, {"id": next_event_id(), "event": "token", "delta": released})
+                        published = True
+        except Exception:
+            if published:
+                event_bus.publish(execution_id, {"id": next_event_id(), "event": "stream_reset"})
+            raise
+
+        remaining, validation = guardrail.close()
+        if not validation["valid"]:
+            log_observability_event(datetime.utcnow(), "agent_completed", "GuardrailAgent", f"Streamed response blocked: {validation['issues']}", execution_id=execution_id)
+            # Tell clients to drop what they have shown so far
+            event_bus.publish(execution_id, {"id": next_event_id(), "event": "stream_blocked", "final_response": SAFETY_MESSAGE})
+            return SAFETY_MESSAGE
+        if remaining:
+            event_bus.publish(execution_id, {"id": next_event_id(), "event": "token", "delta": remaining})
+        return "".join(parts)
+
+    async def _memory_persistence(self, state: OrchestratorState) -> Dict[str, Any]:
+        """Store insights and learnings from the interaction as memories.
+
+        Runs after the output guardrail, so the stored response is the one
+        the user received. The memories are only queued in the outbox here;
+        embedding and storing them happens after the response is returned.
+        The conversation turn itself is queued by run_query for every mode.
+        """
         execution_id = state["execution_id"]
         query = state.get("masked_query", state.get("query"))
         reasoning = state.get("reasoning_summary", "")
@@ -298,36 +511,33 @@ IMPORTANT GUIDELINES:
         
         log_observability_event(datetime.utcnow(), "agent_started", "MemoryAgent", "Persisting interaction to memory", execution_id=execution_id)
         
-        memory_agent = MemoryAgent()
-        
+        memories = []
+        # Fallback reasoning and responses are not worth learning from
+        learn = "chat" not in state.get("degraded", [])
         # Store the reasoning as semantic memory
-        if reasoning:
-            try:
-                reasoning_memory = f"Query: {query[:100]}...\nReasoning: {reasoning[:200]}"
-                await memory_agent.write_memory(
-                    content=reasoning_memory,
-                    memory_type="semantic",
-                    source="orchestrator_reasoning"
-                )
-            except Exception as e:
-                log_observability_event(datetime.utcnow(), "agent_error", "MemoryAgent", f"Failed to store reasoning: {str(e)}", execution_id=execution_id)
-        
-        # Store the final response as episodic memory
-        if generation:
-            try:
-                episodic_memory = f"Query: {query}\nResponse: {generation[:200]}"
-                await memory_agent.write_memory(
-                    content=episodic_memory,
-                    memory_type="episodic",
-                    source="orchestrator_generation"
-                )
-            except Exception as e:
-                log_observability_event(datetime.utcnow(), "agent_error", "MemoryAgent", f"Failed to store episodic memory: {str(e)}", execution_id=execution_id)
+        if reasoning and learn:
+            memories.append({
+                "content": f"Query: {query[:100]}...\nReasoning: {reasoning[:200]}",
+                "type": "semantic",
+                "source": "orchestrator_reasoning"
+            })
+        if generation and learn:
+            # Store the final response as episodic memory
+            memories.append({
+                "content": f"Query: {query}\nResponse: {generation[:200]}",
+                "type": "episodic",
+                "source": "orchestrator_generation"
+            })
+
+        try:
+            await memory_outbox.enqueue(memories)
+        except Exception as e:
+            log_observability_event(datetime.utcnow(), "agent_error", "MemoryAgent", f"Failed to store memories: {str(e)}", level="error", execution_id=execution_id)
         
-        log_observability_event(datetime.utcnow(), "agent_completed", "MemoryAgent", "Interaction persisted to memory", execution_id=execution_id)
-        return state
+        log_observability_event(datetime.utcnow(), "agent_completed", "MemoryAgent", f"Queued {len(memories)} memories for persistence", execution_id=execution_id)
+        return {}
 
-    async def _output_guardrail(self, state: OrchestratorState) -> OrchestratorState:
+    async def _output_guardrail(self, state: OrchestratorState) -> Dict[str, Any]:
         execution_id = state["execution_id"]
         response = state.get("final_response", "")
         log_observability_event(datetime.utcnow(), "agent_started", "GuardrailAgent", "Validating output", execution_id=execution_id)
@@ -339,11 +549,12 @@ IMPORTANT GUIDELINES:
         else:
              validation = guardrail.validate_output(response)
 
+        updates = {}
         if not validation["valid"]:
-            state["final_response"] = "I apologize, but I cannot provide a response to this query due to safety concerns."
+            updates["final_response"] = SAFETY_MESSAGE
 
         log_observability_event(datetime.utcnow(), "agent_completed", "GuardrailAgent", "Output validation completed", execution_id=execution_id)
-        return state
+        return updates
 
     def _cleanup_response(self, response: str) -> str:
         """Clean up response by removing placeholders and excessive formatting."""
@@ -385,4 +596,8 @@ IMPORTANT GUIDELINES:
                 content = mem.get("content") if isinstance(mem, dict) else mem
                 context_parts.append(f"Historical Memory {i+1}: {content}")
         
-        return "\n".join(context_parts)
\ No newline at end of file
+        return "\n".join(context_parts)
+
+
+# Global instance: compiled pipelines are shared by every caller
+orchestrator = Orchestrator()
\ No newline at end of file
@@ -1,142 +1,160 @@
 import chromadb
 import uuid
+from pathlib import Path
 from typing import List, Dict, Any
 from app.config import settings
+from app.db.lexical_index import BM25Index
+from app.utils.bounded_executor import BoundedExecutor
 
 client = chromadb.PersistentClient(path=settings.chroma_path)
+# Keyword index over the same text, kept next to the vector store
+lexical_index = BM25Index(str(Path(settings.chroma_path) / "lexical_index.db"))
+
+# Page size when backfilling the keyword index from Chroma
+BACKFILL_PAGE_SIZE = 1000
+
+# Chroma and the keyword index block, so calls run on these threads instead
+# of the event loop. Queries and writes use separate pools so a long
+# ingestion upsert never delays a query.
+chroma_read_executor = BoundedExecutor("chroma-read", settings.chroma_read_workers, settings.executor_queue_size)
+chroma_write_executor = BoundedExecutor("chroma-write", settings.chroma_write_workers, settings.executor_queue_size)
+
+# Bumped whenever the documents collection changes, so caches of answers
+# derived from it (app/utils/response_cache.py) know to drop them
+_documents_version = 0
+
+def get_documents_version() -> int:
+    return _documents_version
+
+def _bump_documents_version():
+    global _documents_version
+    _documents_version += 1
 
 async def init_chroma_collections():
     """Initialize ChromaDB collections."""
     # Documents collection for RAG
-    client.get_or_create_collection("documents")
+    documents = client.get_or_create_collection("documents")
     # Memory collection for episodic/semantic memory
-    client.get_or_create_collection("memory")
+    memory = client.get_or_create_collection("memory")
+    # Index text stored before the keyword index existed
+    for name, collection in (("documents", documents), ("memory", memory)):
+        if lexical_index.count(name) == 0 and collection.count() > 0:
+            _backfill_lexical_index(name, collection)
 
-async def store_document_embeddings(chunks: List[str], embeddings: List[List[float]], metadata: List[Dict[str, Any]] = None):
-    """Store document chunks with embeddings."""
-    collection = client.get_or_create_collection("documents")
-    ids = [f"doc_{uuid.uuid4()}" for _ in range(len(chunks))]
+def _backfill_lexical_index(name: str, collection):
+    offset = 0
+    while True:
+        page = collection.get(limit=BACKFILL_PAGE_SIZE, offset=offset, include=["documents", "metadatas"])
+        if not page.get("ids"):
+            break
+        lexical_index.add(name, page["ids"], page["documents"], page["metadatas"])
+        offset += len(page["ids"])
+
+async def store_document_embeddings(chunks: List[str], embeddings: List[List[float]], metadata: List[Dict[str, Any]] = None, ids: List[str] = None):
+    """Store document chunks with embeddings.
+
+    Pass stable ids to make re-ingesting the same chunks idempotent (upsert).
+    """
     if metadata is None:
         metadata = [{}] * len(chunks)
-    collection.add(ids=ids, embeddings=embeddings, documents=chunks, metadatas=metadata)
+    upsert = ids is not None
+    if not upsert:
+        ids = [f"doc_{uuid.uuid4()}" for _ in range(len(chunks))]
+
+    def write():
+        collection = client.get_or_create_collection("documents")
+        if upsert:
+            collection.upsert(ids=ids, embeddings=embeddings, documents=chunks, metadatas=metadata)
+        else:
+            collection.add(ids=ids, embeddings=embeddings, documents=chunks, metadatas=metadata)
+        lexical_index.add("documents", ids, chunks, metadata)
+
+    await chroma_write_executor.run(write)
+    _bump_documents_version()
+
+async def delete_document_embeddings(source: str):
+    """Delete every document chunk whose metadata `source` matches."""
+    def write():
+        collection = client.get_or_create_collection("documents")
+        collection.delete(where={"source": source})
+        lexical_index.delete("documents", source=source)
+
+    await chroma_write_executor.run(write)
+    _bump_documents_version()
 
 async def search_documents(query_embedding: List[float], n_results: int = 5, query_text: str = None) -> Dict[str, Any]:
     """Search documents by embedding with keyword fallback."""
-    collection = client.get_or_create_collection("documents")
-    
     # Try semantic search first
+    results = await search_documents_dense(query_embedding, n_results)
+    if any(results["documents"][0]):
+        return results
+
+    # Fallback to the BM25 index if embedding search fails or returns empty
+    if query_text:
+        print(f"Falling back to keyword search for: {query_text}")
+        return await search_documents_lexical(query_text, n_results)
+
+    return {"documents": [[]], "metadatas": [[]], "ids": [[]]}
+
+async def search_documents_dense(query_embedding: List[float], n_results: int = 5) -> Dict[str, Any]:
+    """Semantic search only; empty results if the embedding is missing or the query fails."""
     try:
         if query_embedding and any(query_embedding):  # Check if embedding is valid
-            results = collection.query(query_embeddings=[query_embedding], n_results=n_results)
+            def query():
+                collection = client.get_or_create_collection("documents")
+                return collection.query(query_embeddings=[query_embedding], n_results=n_results)
+            results = await chroma_read_executor.run(query)
             if results.get("documents") and any(results.get("documents", [[]])[0]):
                 return results
     except Exception as e:
         print(f"Semantic search failed: {e}")
-    
-    # Fallback to keyword search if embedding search fails or returns empty
-    if query_text:
-        print(f"Falling back to keyword search for: {query_text}")
-        all_docs = collection.get()
-        if not all_docs.get("documents"):
-            return {"documents": [[]], "metadatas": [[]], "ids": [[]]}
-        
-        # Extract keywords from query
-        keywords = set(query_text.lower().split())
-        keywords.discard("and")
-        keywords.discard("or")
-        keywords.discard("the")
-        keywords.discard("a")
-        keywords.discard("is")
-        
-        # Score documents by keyword matches
-        scored_docs = []
-        for i, doc in enumerate(all_docs.get("documents", [])):
-            doc_lower = doc.lower() if doc else ""
-            score = sum(1 for kw in keywords if kw in doc_lower)
-            if score > 0:
-                scored_docs.append((score, i, doc))
-        
-        # Sort by score (descending) and get top n
-        scored_docs.sort(key=lambda x: x[0], reverse=True)
-        top_docs = scored_docs[:n_results]
-        
-        # Format as Chroma results
-        doc_ids = all_docs.get("ids", [])
-        doc_metadatas = all_docs.get("metadatas", [])
-        
-        return {
-            "documents": [[doc[2] for doc in top_docs]] if top_docs else [[]],
-            "metadatas": [[doc_metadatas[doc[1]] for doc in top_docs]] if top_docs else [[]],
-            "ids": [[doc_ids[doc[1]] for doc in top_docs]] if top_docs else [[]]
-        }
-    
     return {"documents": [[]], "metadatas": [[]], "ids": [[]]}
 
-async def store_memory_embeddings(memories: List[str], embeddings: List[List[float]], memory_types: List[str]):
-    """Store memory items with embeddings."""
-    collection = client.get_or_create_collection("memory")
-    ids = [f"mem_{uuid.uuid4()}" for _ in range(len(memories))]
+async def search_documents_lexical(query_text: str, n_results: int = 5) -> Dict[str, Any]:
+    """BM25 keyword search over document chunks."""
+    return await chroma_read_executor.run(lexical_index.search, "documents", query_text, n_results)
+
+async def store_memory_embeddings(memories: List[str], embeddings: List[List[float]], memory_types: List[str], ids: List[str] = None):
+    """Store memory items with embeddings.
+
+    Pass the memory ids to make storing the same items again idempotent (upsert).
+    """
     metadata = [{"type": memory_type} for memory_type in memory_types]
-    collection.add(ids=ids, embeddings=embeddings, documents=memories, metadatas=metadata)
+    upsert = ids is not None
+    if not upsert:
+        ids = [f"mem_{uuid.uuid4()}" for _ in range(len(memories))]
+
+    def write():
+        collection = client.get_or_create_collection("memory")
+        if upsert:
+            collection.upsert(ids=ids, embeddings=embeddings, documents=memories, metadatas=metadata)
+        else:
+            collection.add(ids=ids, embeddings=embeddings, documents=memories, metadatas=metadata)
+        lexical_index.add("memory", ids, memories, metadata)
+
+    await chroma_write_executor.run(write)
 
 async def search_memory(query_embedding: List[float], memory_type: str = None, n_results: int = 5, query_text: str = None) -> Dict[str, Any]:
     """Search memory by embedding and optional type, with keyword fallback."""
-    collection = client.get_or_create_collection("memory")
-    
     # Try semantic search first
     try:
         if query_embedding and any(query_embedding):  # Check if embedding is valid
-            if memory_type:
-                where = {"type": memory_type}
-                results = collection.query(query_embeddings=[query_embedding], n_results=n_results, where=where)
-            else:
-                results = collection.query(query_embeddings=[query_embedding], n_results=n_results)
-            
+            def query():
+                collection = client.get_or_create_collection("memory")
+                if memory_type:
+                    where = {"type": memory_type}
+                    return collection.query(query_embeddings=[query_embedding], n_results=n_results, where=where)
+                return collection.query(query_embeddings=[query_embedding], n_results=n_results)
+            results = await chroma_read_executor.run(query)
+
             if results.get("documents") and any(results.get("documents", [[]])[0]):
                 return results
     except Exception as e:
         print(f"Semantic memory search failed: {e}")
     
-    # Fallback to keyword search if embedding search fails or returns empty
+    # Fallback to the BM25 index if embedding search fails or returns empty
     if query_text:
         print(f"Falling back to keyword memory search for: {query_text}")
-        all_memories = collection.get()
-        if not all_memories.get("documents"):
-            return {"documents": [[]], "metadatas": [[]], "ids": [[]]}
-        
-        # Extract keywords from query
-        keywords = set(query_text.lower().split())
-        keywords.discard("and")
-        keywords.discard("or")
-        keywords.discard("the")
-        keywords.discard("a")
-        keywords.discard("is")
-        
-        # Score memories by keyword matches
-        scored_memories = []
-        for i, memory in enumerate(all_memories.get("documents", [])):
-            memory_lower = memory.lower() if memory else ""
-            score = sum(1 for kw in keywords if kw in memory_lower)
-            if score > 0:
-                # Filter by memory_type if specified
-                if memory_type:
-                    mem_metadata = all_memories.get("metadatas", [{}])[i] if i < len(all_memories.get("metadatas", [])) else {}
-                    if mem_metadata.get("type") != memory_type:
-                        continue
-                scored_memories.append((score, i, memory))
-        
-        # Sort by score (descending) and get top n
-        scored_memories.sort(key=lambda x: x[0], reverse=True)
-        top_memories = scored_memories[:n_results]
-        
-        # Format as Chroma results
-        mem_ids = all_memories.get("ids", [])
-        mem_metadatas = all_memories.get("metadatas", [])
-        
-        return {
-            "documents": [[mem[2] for mem in top_memories]] if top_memories else [[]],
-            "metadatas": [[mem_metadatas[mem[1]] for mem in top_memories]] if top_memories else [[]],
-            "ids": [[mem_ids[mem[1]] for mem in top_memories]] if top_memories else [[]]
-        }
-    
-    return {"documents": [[]], "metadatas": [[]], "ids": [[]]}
\ No newline at end of file
+        return await chroma_read_executor.run(lexical_index.search, "memory", query_text, n_results, doc_type=memory_type)
+
+    return {"documents": [[]], "metadatas": [[]], "ids": [[]]}
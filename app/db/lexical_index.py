@@ -0,0 +1,265 @@
+import json
+import math
+import re
+import sqlite3
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+# Words too common to help ranking
+STOPWORDS = {"a", "an", "and", "or", "the", "is", "are", "was", "to", "of", "in", "on", "for", "with", "it", "this", "that"}
+
+# Words plus compound identifiers such as "inc-1023" or "v2.1"
+_TOKEN_PATTERN = re.compile(r"\w+(?:[-.:/]\w+)*")
+_SPLIT_PATTERN = re.compile(r"[-.:/]")
+MAX_IDS_PER_STATEMENT = 500
+# Terms in more than this share of documents don't select candidates on
+# their own; they still add to the score of candidates found by rarer terms
+COMMON_TERM_RATIO = 0.5
+COMMON_TERM_MIN_DF = 1000
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase terms; compound identifiers are indexed whole and by their parts."""
+    terms = []
+    for match in _TOKEN_PATTERN.finditer(text.lower()):
+        token = match.group()
+        if token not in STOPWORDS:
+            terms.append(token)
+        if _SPLIT_PATTERN.search(token):
+            terms.extend(part for part in _SPLIT_PATTERN.split(token) if part and part not in STOPWORDS)
+    return terms
+
+
+class BM25Index:
+    """Persistent BM25 inverted index over the text stored in Chroma collections.
+
+    Postings live in SQLite keyed by (collection, term), so a query only reads
+    the posting lists of its own terms instead of scanning the collection.
+    Very common terms are only looked up for candidates found by rarer ones,
+    so they don't turn a query into a scan either.
+    The index is updated incrementally as chunks and memories are stored or
+    deleted. Writes share one connection behind a lock; each reading thread
+    has its own connection and reads a WAL snapshot, so searches never wait
+    for an ingestion write to finish.
+    """
+
+    def __init__(self, path: str, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.path = path
+        self._lock = threading.Lock()
+        self._readers = threading.local()
+        # The file is opened on first use, so importing creates nothing
+        self._conn: Optional[sqlite3.Connection] = None
+        self._open_lock = threading.Lock()
+
+    def add(self, collection: str, ids: List[str], documents: List[str], metadatas: List[Dict[str, Any]] = None):
+        """Index documents, replacing any existing entries with the same ids."""
+        metadatas = metadatas or [{}] * len(ids)
+        self._open()
+        with self._lock:
+            self._remove(collection, ids)
+            doc_rows, posting_rows = [], []
+            total_length = 0
+            for doc_id, document, metadata in zip(ids, documents, metadatas):
+                terms = Counter(tokenize(document or ""))
+                length = sum(terms.values())
+                total_length += length
+                metadata = metadata or {}
+                doc_rows.append((collection, doc_id, length, document, json.dumps(metadata), metadata.get("source"), metadata.get("type")))
+                posting_rows.extend((collection, term, doc_id, tf) for term, tf in terms.items())
+            self._conn.executemany("INSERT INTO docs VALUES (?, ?, ?, ?, ?, ?, ?)", doc_rows)
+            self._conn.executemany("INSERT INTO postings VALUES (?, ?, ?, ?)", posting_rows)
+            self._update_df(collection, Counter(term for _, term, _, _ in posting_rows))
+            self._update_stats(collection, len(doc_rows), total_length)
+            self._conn.commit()
+
+    def delete(self, collection: str, ids: Iterable[str] = None, source: str = None):
+        """Remove documents by id or by metadata source."""
+        self._open()
+        with self._lock:
+            if source is not None:
+                ids = [row[0] for row in self._conn.execute(
+                    "SELECT doc_id FROM docs WHERE collection = ? AND source = ?", (collection, source)
+                )]
+            self._remove(collection, list(ids or []))
+            self._conn.commit()
+
+    def count(self, collection: str) -> int:
+        row = self._reader().execute("SELECT doc_count FROM stats WHERE collection = ?", (collection,)).fetchone()
+        return row[0] if row else 0
+
+    def search(self, collection: str, query: str, n_results: int = 5, doc_type: str = None) -> Dict[str, Any]:
+        """Return the top BM25 matches in Chroma's query result shape."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        empty = {"documents": [[]], "metadatas": [[]], "ids": [[]], "distances": [[]]}
+        if not terms:
+            return empty
+
+        conn = self._reader()
+        # One read transaction, so every statement sees the same snapshot
+        conn.execute("BEGIN")
+        try:
+            stats = conn.execute(
+                "SELECT doc_count, total_length FROM stats WHERE collection = ?", (collection,)
+            ).fetchone()
+            if not stats or not stats[0]:
+                return empty
+            doc_count, total_length = stats
+            avg_length = total_length / doc_count or 1.0
+
+            placeholders = ",".join("?" * len(terms))
+            document_frequency = dict(conn.execute(
+                f"SELECT term, df FROM terms WHERE collection = ? AND term IN ({placeholders})", [collection, *terms]
+            ).fetchall())
+            if not document_frequency:
+                return empty
+            selective = [term for term, df in document_frequency.items() if df <= max(COMMON_TERM_RATIO * doc_count, COMMON_TERM_MIN_DF)]
+            if not selective:
+                selective = [min(document_frequency, key=document_frequency.get)]
+            common = [term for term in document_frequency if term not in selective]
+
+            placeholders = ",".join("?" * len(selective))
+            sql = (
+                "SELECT p.term, p.doc_id, p.tf, d.length FROM postings p "
+                "JOIN docs d ON d.collection = p.collection AND d.doc_id = p.doc_id "
+                f"WHERE p.collection = ? AND p.term IN ({placeholders})"
+            )
+            params: List[Any] = [collection, *selective]
+            if doc_type:
+                sql += " AND d.type = ?"
+                params.append(doc_type)
+            rows = conn.execute(sql, params).fetchall()
+
+            lengths = {doc_id: length for _, doc_id, _, length in rows}
+            candidates = list(lengths)
+            for term in common:
+                for i in range(0, len(candidates), MAX_IDS_PER_STATEMENT):
+                    batch = candidates[i:i + MAX_IDS_PER_STATEMENT]
+                    rows.extend(
+                        (term, doc_id, tf, lengths[doc_id])
+                        for doc_id, tf in conn.execute(
+                            f"SELECT doc_id, tf FROM postings WHERE collection = ? AND term = ? AND doc_id IN ({','.join('?' * len(batch))})",
+                            [collection, term, *batch],
+                        )
+                    )
+
+            scores: Dict[str, float] = {}
+            for term, doc_id, tf, length in rows:
+                df = document_frequency[term]
+                idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+                norm = tf + self.k1 * (1 - self.b + self.b * length / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / norm
+
+            top = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:n_results]
+            if not top:
+                return empty
+            placeholders = ",".join("?" * len(top))
+            details = {
+                doc_id: (document, json.loads(metadata) if metadata else {})
+                for doc_id, document, metadata in conn.execute(
+                    f"SELECT doc_id, document, metadata FROM docs WHERE collection = ? AND doc_id IN ({placeholders})",
+                    [collection, *(doc_id for doc_id, _ in top)],
+                )
+            }
+        finally:
+            conn.execute("COMMIT")
+
+        return {
+            "documents": [[details[doc_id][0] for doc_id, _ in top]],
+            "metadatas": [[details[doc_id][1] for doc_id, _ in top]],
+            "ids": [[doc_id for doc_id, _ in top]],
+            # Higher BM25 is better; negate so lower means closer, like Chroma distances
+            "distances": [[-score for _, score in top]],
+        }
+
+    def _open(self):
+        with self._open_lock:
+            if self._conn is not None:
+                return
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.executescript("""
+                PRAGMA journal_mode=WAL;
+                PRAGMA synchronous=NORMAL;
+                CREATE TABLE IF NOT EXISTS docs (
+                    collection TEXT NOT NULL,
+                    doc_id TEXT NOT NULL,
+                    length INTEGER NOT NULL,
+                    document TEXT,
+                    metadata TEXT,
+                    source TEXT,
+                    type TEXT,
+                    PRIMARY KEY (collection, doc_id)
+                );
+                CREATE INDEX IF NOT EXISTS ix_docs_source ON docs (collection, source);
+                CREATE TABLE IF NOT EXISTS postings (
+                    collection TEXT NOT NULL,
+                    term TEXT NOT NULL,
+                    doc_id TEXT NOT NULL,
+                    tf INTEGER NOT NULL,
+                    PRIMARY KEY (collection, term, doc_id)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS ix_postings_doc ON postings (collection, doc_id);
+                CREATE TABLE IF NOT EXISTS terms (
+                    collection TEXT NOT NULL,
+                    term TEXT NOT NULL,
+                    df INTEGER NOT NULL,
+                    PRIMARY KEY (collection, term)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS stats (
+                    collection TEXT PRIMARY KEY,
+                    doc_count INTEGER NOT NULL,
+                    total_length INTEGER NOT NULL
+                );
+            """)
+            conn.commit()
+            self._conn = conn
+
+    def _reader(self) -> sqlite3.Connection:
+        """This thread's read connection."""
+        conn = getattr(self._readers, "conn", None)
+        if conn is None:
+            self._open()
+            # Autocommit, so read transactions are only as long as the explicit BEGIN/COMMIT
+            conn = self._readers.conn = sqlite3.connect(self.path, isolation_level=None)
+            conn.execute("PRAGMA query_only=ON")
+        return conn
+
+    def _remove(self, collection: str, ids: List[str]):
+        # Stay under SQLite's bound parameter limit
+        for i in range(0, len(ids), MAX_IDS_PER_STATEMENT):
+            batch = ids[i:i + MAX_IDS_PER_STATEMENT]
+            placeholders = ",".join("?" * len(batch))
+            removed = self._conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(length), 0) FROM docs WHERE collection = ? AND doc_id IN ({placeholders})",
+                [collection, *batch],
+            ).fetchone()
+            if not removed[0]:
+                continue
+            removed_terms = self._conn.execute(
+                f"SELECT term, COUNT(*) FROM postings WHERE collection = ? AND doc_id IN ({placeholders}) GROUP BY term",
+                [collection, *batch],
+            ).fetchall()
+            self._update_df(collection, {term: -count for term, count in removed_terms})
+            self._conn.execute(f"DELETE FROM postings WHERE collection = ? AND doc_id IN ({placeholders})", [collection, *batch])
+            self._conn.execute(f"DELETE FROM docs WHERE collection = ? AND doc_id IN ({placeholders})", [collection, *batch])
+            self._update_stats(collection, -removed[0], -removed[1])
+
+    def _update_df(self, collection: str, deltas: Dict[str, int]):
+        self._conn.executemany(
+            "INSERT INTO terms (collection, term, df) VALUES (?, ?, ?) "
+            "ON CONFLICT(collection, term) DO UPDATE SET df = df + excluded.df",
+            [(collection, term, delta) for term, delta in deltas.items()],
+        )
+        self._conn.execute("DELETE FROM terms WHERE collection = ? AND df <= 0", (collection,))
+
+    def _update_stats(self, collection: str, doc_delta: int, length_delta: int):
+        self._conn.execute(
+            "INSERT INTO stats (collection, doc_count, total_length) VALUES (?, ?, ?) "
+            "ON CONFLICT(collection) DO UPDATE SET doc_count = doc_count + excluded.doc_count, "
+            "total_length = total_length + excluded.total_length",
+            (collection, doc_delta, length_delta),
+        )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -16,6 +16,18 @@ class Memory(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     is_deleted = Column(Boolean, default=False)
 
+class PendingMemory(Base):
+    """A memory waiting for the write-behind worker (app/core/memory_outbox.py)."""
+    __tablename__ = "memory_outbox"
+
+    id = Column(String, primary_key=True)  # Becomes the memory id
+    type = Column(String, nullable=False)
+    content = Column(Text, nullable=False)
+    source = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    attempts = Column(Integer, default=0)
+    last_error = Column(Text, nullable=True)
+
 class Execution(Base):
     __tablename__ = "executions"
 
@@ -26,6 +38,15 @@ class Execution(Base):
     started_at = Column(DateTime, default=datetime.utcnow)
     completed_at = Column(DateTime, nullable=True)
     result = Column(Text, nullable=True)
+    # Comma-separated upstreams answered by fallbacks, e.g. "chat,embeddings"
+    degraded = Column(String, nullable=True)
+
+class IdSequence(Base):
+    """Ids reserved in blocks, so processes sharing the database never hand out the same one."""
+    __tablename__ = "id_sequences"
+
+    name = Column(String, primary_key=True)  # Table the ids are for
+    last_id = Column(Integer, nullable=False)  # Highest id reserved so far
 
 class Feedback(Base):
     __tablename__ = "feedbacks"
@@ -40,6 +61,8 @@ class Feedback(Base):
 
 class ObservabilityEvent(Base):
     __tablename__ = "observability_events"
+    # Stream replay reads one execution's events after a given id
+    __table_args__ = (Index("ix_observability_events_execution_id_id", "execution_id", "id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     execution_id = Column(String, ForeignKey("executions.id"), index=True)
@@ -1,13 +1,19 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, func, insert, inspect, text
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from app.config import settings
+from app.core.event_bus import event_bus
+from app.utils.bounded_executor import BoundedExecutor
+from app.utils.event_sink import EventSink
 from typing import List, Optional
 from datetime import datetime
+import atexit
+import re
+import threading
 import uuid
 
 # Use canonical models defined in app/db/models.py to avoid schema drift
-from app.db.models import Base, Memory, Execution, Feedback, ObservabilityEvent
+from app.db.models import Base, Memory, PendingMemory, Execution, Feedback, ObservabilityEvent
 
 engine = create_engine(settings.database_url, echo=True)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -24,123 +30,490 @@ else:
 async_engine = create_async_engine(async_db_url, echo=True)
 async_session = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
 
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets reads run while a write commits and makes commits cheaper;
+    # busy_timeout makes a writer wait for the lock instead of failing
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.close()
+
+if engine.dialect.name == "sqlite":
+    event.listen(engine, "connect", _set_sqlite_pragmas)
+    event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+
+# Request-path queries run on these threads so they never block the event
+# loop. SQLite has one writer at a time, so writes share a single thread and
+# queue in order instead of retrying on the file lock; with WAL the reader
+# threads run alongside it.
+db_read_executor = BoundedExecutor("db-read", settings.db_read_workers, settings.executor_queue_size)
+db_write_executor = BoundedExecutor("db-write", 1, settings.executor_queue_size)
+
+# Full-text index over non-deleted rows of `memories`; the triggers keep it
+# in sync on insert, update (including soft delete) and delete. The index
+# keeps its own copy of the text under a rowid from memory_fts_ids, an
+# INTEGER PRIMARY KEY that VACUUM never renumbers (unlike the implicit rowid
+# of `memories`, whose primary key is a string).
+MEMORY_FTS_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS memory_fts_ids (
+        rowid INTEGER PRIMARY KEY, memory_id TEXT NOT NULL UNIQUE
+    )""",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS memories_fts USING fts5(
+        content, type UNINDEXED, tokenize='porter unicode61'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS memories_fts_insert AFTER INSERT ON memories WHEN new.is_deleted = 0 BEGIN
+        INSERT OR IGNORE INTO memory_fts_ids(memory_id) VALUES (new.id);
+        INSERT INTO memories_fts(rowid, content, type)
+            SELECT rowid, new.content, new.type FROM memory_fts_ids WHERE memory_id = new.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS memories_fts_update AFTER UPDATE ON memories BEGIN
+        DELETE FROM memories_fts WHERE rowid = (SELECT rowid FROM memory_fts_ids WHERE memory_id = old.id);
+        INSERT OR IGNORE INTO memory_fts_ids(memory_id) SELECT new.id WHERE new.is_deleted = 0;
+        INSERT INTO memories_fts(rowid, content, type)
+            SELECT rowid, new.content, new.type FROM memory_fts_ids WHERE memory_id = new.id AND new.is_deleted = 0;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS memories_fts_delete AFTER DELETE ON memories BEGIN
+        DELETE FROM memories_fts WHERE rowid = (SELECT rowid FROM memory_fts_ids WHERE memory_id = old.id);
+        DELETE FROM memory_fts_ids WHERE memory_id = old.id;
+    END""",
+]
+
 def init_db():
     Base.metadata.create_all(bind=engine)
+    _migrate()
+    _init_memory_fts()
+    # Reserved here so the first events logged don't wait for the database
+    _reserve_event_id_block()
+
+def _migrate():
+    """Bring tables created by older versions up to date.
+
+    create_all only creates missing tables, so columns and indexes added to
+    existing tables are created here. New columns must be nullable.
+    """
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        with engine.begin() as conn:
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN "{column.name}" {column_type}'))
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+def _init_memory_fts():
+    with engine.begin() as conn:
+        exists = conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'memories_fts'")).first()
+        for statement in MEMORY_FTS_SCHEMA:
+            conn.execute(text(statement))
+        if not exists:
+            # Backfill rows written before the index existed
+            conn.execute(text("INSERT OR IGNORE INTO memory_fts_ids(memory_id) SELECT id FROM memories WHERE is_deleted = 0"))
+            conn.execute(text(
+                "INSERT INTO memories_fts(rowid, content, type) "
+                "SELECT f.rowid, m.content, m.type FROM memory_fts_ids f JOIN memories m ON m.id = f.memory_id "
+                "WHERE m.is_deleted = 0"
+            ))
 
-def create_execution(execution_id: str, conversation_id: str, query: str) -> str:
+async def create_execution(execution_id: str, conversation_id: str, query: str) -> str:
     """Create an execution record."""
-    with SessionLocal() as session:
-        execution = Execution(id=execution_id, conversation_id=conversation_id, query=query, status="running")
-        session.add(execution)
-        session.commit()
+    def write():
+        with SessionLocal() as session:
+            execution = Execution(id=execution_id, conversation_id=conversation_id, query=query, status="running")
+            session.add(execution)
+            session.commit()
+    await db_write_executor.run(write)
     return execution_id
 
-def update_execution_status(execution_id: str, status: str, result: str = None):
+async def update_execution_status(execution_id: str, status: str, result: str = None, degraded: List[str] = None):
+    def write():
+        with SessionLocal() as session:
+            execution = session.query(Execution).filter(Execution.id == execution_id).first()
+            if execution:
+                execution.status = status
+                if status in ("completed", "failed"):
+                    try:
+                        execution.completed_at = datetime.utcnow()
+                    except Exception:
+                        pass
+                if result is not None:
+                    execution.result = result
+                if degraded:
+                    execution.degraded = ",".join(degraded)
+                session.commit()
+    await db_write_executor.run(write)
+
+# Event ids reserved per database round trip
+EVENT_ID_BLOCK_SIZE = 1000
+
+def _reserve_ids(table: str, count: int) -> int:
+    """Reserve `count` consecutive ids for `table` and return the first.
+
+    The UPDATE takes SQLite's write lock before anything is read, so
+    concurrent processes always reserve disjoint blocks. The sequence
+    starts after the table's highest id.
+    """
+    with engine.begin() as conn:
+        params = {"table": table, "count": count}
+        reserved = conn.execute(text("UPDATE id_sequences SET last_id = last_id + :count WHERE name = :table"), params).rowcount
+        if not reserved:
+            conn.execute(text(
+                f"INSERT INTO id_sequences (name, last_id) SELECT :table, COALESCE(MAX(id), 0) + :count FROM {table}"
+            ), params)
+        last_id = conn.execute(text("SELECT last_id FROM id_sequences WHERE name = :table"), params).scalar()
+    return last_id - count + 1
+
+_event_id_lock = threading.Lock()
+_next_event_id = 0
+_event_id_limit = 0
+# First ids of reserved blocks not in use yet, and the thread reserving the next one
+_spare_event_id_blocks: List[int] = []
+_event_id_refill: Optional[threading.Thread] = None
+
+def _reserve_event_id_block():
+    start = _reserve_ids(ObservabilityEvent.__tablename__, EVENT_ID_BLOCK_SIZE)
+    with _event_id_lock:
+        _spare_event_id_blocks.append(start)
+
+def _refill_event_ids():
+    global _event_id_refill
+    try:
+        _reserve_event_id_block()
+    except Exception as e:
+        print(f"Warning: Failed to reserve event ids: {e}")
+    finally:
+        with _event_id_lock:
+            _event_id_refill = None
+
+def next_event_id() -> int:
+    """Next observability event id.
+
+    Ids are assigned when an event is logged, so they increase in logging
+    order within a process (and so within an execution), and streams can
+    use them to resume. Ids come from blocks reserved in the database, so
+    server workers and scripts sharing it never hand out the same id.
+    init_db reserves the first block; once half of a block is used the
+    next one is reserved on a background thread, so logging never waits
+    for the database unless it outruns that reservation.
+    """
+    global _next_event_id, _event_id_limit, _event_id_refill
+    with _event_id_lock:
+        if _next_event_id >= _event_id_limit and _spare_event_id_blocks:
+            _next_event_id = _spare_event_id_blocks.pop(0)
+            _event_id_limit = _next_event_id + EVENT_ID_BLOCK_SIZE
+        if _next_event_id < _event_id_limit:
+            if (not _spare_event_id_blocks and _event_id_refill is None
+                    and _event_id_limit - _next_event_id <= EVENT_ID_BLOCK_SIZE // 2):
+                _event_id_refill = threading.Thread(target=_refill_event_ids, name="event-id-reserve", daemon=True)
+                _event_id_refill.start()
+            _next_event_id += 1
+            return _next_event_id - 1
+        refill = _event_id_refill
+    # Out of ids: logging before init_db, or faster than the background reservation
+    if refill is not None:
+        refill.join()
+    else:
+        _reserve_event_id_block()
+    return next_event_id()
+
+def _write_observability_events(events: List[dict]):
+    """Insert a batch of observability events in one transaction."""
     with SessionLocal() as session:
-        execution = session.query(Execution).filter(Execution.id == execution_id).first()
-        if execution:
-            execution.status = status
-            if status in ("completed", "failed"):
-                try:
-                    execution.completed_at = datetime.utcnow()
-                except Exception:
-                    pass
-            if result is not None:
-                execution.result = result
-            session.commit()
+        session.execute(insert(ObservabilityEvent), [
+            {
+                "id": event["id"],
+                "timestamp": event["timestamp"],
+                "event_type": event["event_type"],
+                "agent_name": event["agent_name"],
+                "tool_name": None,
+                "data": event["message"],
+                "execution_id": event["execution_id"]
+            } for event in events
+        ])
+        session.commit()
+
+# Logged at "error" level whatever the caller passes, so overload sampling
+# (which only sheds "info" events) never drops them
+ERROR_EVENT_TYPES = {"agent_error"}
+
+# Observability events are written in batches off the request path
+event_sink = EventSink(
+    _write_observability_events,
+    max_queue_size=settings.observability_queue_size,
+    batch_size=settings.observability_batch_size,
+    flush_interval_ms=settings.observability_flush_interval_ms,
+    overload_policy=settings.observability_overload_policy,
+    sample_rate=settings.observability_sample_rate,
+)
+# Scripts exit without a shutdown hook; write what is queued
+atexit.register(event_sink.close)
 
 def log_observability_event(timestamp: datetime, event_type: str, agent_name: str = None, message: str = None, level: str = "info", execution_id: str = None):
     """Log an observability event.
 
     Signature: (timestamp, event_type, agent_name, message, level="info", execution_id=None)
+
+    Non-blocking: the event is queued and written by `event_sink` shortly
+    after. Events of an execution are also published to live streams.
     """
-    print(f"Logging event: {event_type} at {timestamp.isoformat()} message: {message} agent: {agent_name} level: {level} execution_id: {execution_id}")
-    with SessionLocal() as session:
-        event = ObservabilityEvent(
-            timestamp=timestamp,
-            event_type=event_type,
-            agent_name=agent_name,
-            tool_name=None,
-            data=message,
-            execution_id=execution_id
-        )
-        session.add(event)
-        session.commit()
+    if event_type in ERROR_EVENT_TYPES:
+        level = "error"
+    event_id = next_event_id()
+    if execution_id:
+        event_bus.publish(execution_id, {
+            "id": event_id,
+            "event": event_type,
+            "agent": agent_name,
+            "message": message,
+            "timestamp": timestamp.isoformat()
+        })
+    event_sink.emit({
+        "id": event_id,
+        "timestamp": timestamp,
+        "event_type": event_type,
+        "agent_name": agent_name,
+        "message": message,
+        "level": level,
+        "execution_id": execution_id
+    })
 
-def get_memory_items() -> List[dict]:
-    with SessionLocal() as session:
-        memories = session.query(Memory).filter(Memory.is_deleted == False).all()
-        return [
-            {
-                "id": memory.id,
-                "type": memory.type,
-                "content": memory.content,
-                "source": memory.source,
-                "created_at": memory.created_at.isoformat() if memory.created_at else None
-            } for memory in memories
-        ]
-
-def create_memory_item(memory_id: str, content: str, memory_type: str, source: str = None) -> str:
+async def get_memory_items() -> List[dict]:
+    def read():
+        with SessionLocal() as session:
+            memories = session.query(Memory).filter(Memory.is_deleted == False).all()
+            return [
+                {
+                    "id": memory.id,
+                    "type": memory.type,
+                    "content": memory.content,
+                    "source": memory.source,
+                    "created_at": memory.created_at.isoformat() if memory.created_at else None
+                } for memory in memories
+            ]
+    return await db_read_executor.run(read)
+
+# Words in more than this share of memories (and at least MIN_DOCS of them)
+# are dropped from multi-word searches: they barely move the ranking but
+# make SQLite visit most of the index
+MEMORY_SEARCH_COMMON_TERM_RATIO = 0.02
+MEMORY_SEARCH_COMMON_TERM_MIN_DOCS = 1000
+
+def _fts_phrase(word: str) -> str:
+    return f'"{word}"'
+
+def _selective_terms(conn, words: List[str]) -> List[str]:
+    """Drop very common words from a multi-word query, keeping at least one word."""
+    if len(words) < 2:
+        return words
+    # memory_fts_ids is an INTEGER PRIMARY KEY table, so MAX(rowid) is a cheap
+    # estimate of the number of indexed memories
+    total = conn.execute(text("SELECT COALESCE(MAX(rowid), 0) FROM memory_fts_ids")).scalar()
+    threshold = max(MEMORY_SEARCH_COMMON_TERM_MIN_DOCS, int(total * MEMORY_SEARCH_COMMON_TERM_RATIO))
+    # Count each word's matches, capped just above the threshold, in one query
+    counts = conn.execute(
+        text(" UNION ALL ".join(
+            f"SELECT {i}, (SELECT COUNT(*) FROM (SELECT 1 FROM memories_fts WHERE memories_fts MATCH :match{i} LIMIT :cap))"
+            for i in range(len(words))
+        )),
+        {"cap": threshold + 1, **{f"match{i}": _fts_phrase(word) for i, word in enumerate(words)}},
+    ).all()
+    selective = [words[i] for i, count in counts if count <= threshold]
+    return selective or words
+
+async def search_memory_items(query: str, memory_type: str = None, limit: int = 5) -> List[dict]:
+    """Keyword search over non-deleted memories, ranked by BM25 in SQLite."""
+    words = list(dict.fromkeys(re.findall(r"\w+", query.lower())))
+    if not words:
+        return []
+    sql = (
+        "SELECT m.id, m.type, m.content, m.source, m.created_at FROM memories_fts "
+        "JOIN memory_fts_ids f ON f.rowid = memories_fts.rowid "
+        "JOIN memories m ON m.id = f.memory_id "
+        "WHERE memories_fts MATCH :match"
+    )
+    params = {"limit": limit}
+    if memory_type:
+        sql += " AND memories_fts.type = :type"
+        params["type"] = memory_type
+    sql += " ORDER BY bm25(memories_fts) LIMIT :limit"
+    def read():
+        with engine.connect() as conn:
+            # Match any of the words
+            params["match"] = " OR ".join(_fts_phrase(word) for word in _selective_terms(conn, words))
+            return conn.execute(text(sql), params).all()
+    rows = await db_read_executor.run(read)
+    return [
+        {
+            "id": row.id,
+            "type": row.type,
+            "content": row.content,
+            "source": row.source,
+            # Raw SQL returns SQLite's stored text, e.g. "2024-01-01 12:00:00.000000"
+            "created_at": datetime.fromisoformat(row.created_at).isoformat() if row.created_at else None
+        } for row in rows
+    ]
+
+async def create_memory_item(memory_id: str, content: str, memory_type: str, source: str = None) -> str:
     """Create a new memory item in SQLite."""
-    with SessionLocal() as session:
-        memory = Memory(
-            id=memory_id,
-            type=memory_type,
-            content=content,
-            source=source,
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow(),
-            is_deleted=False
-        )
-        session.add(memory)
-        session.commit()
-        return memory_id
+    await create_memory_items([{"id": memory_id, "content": content, "type": memory_type, "source": source}])
+    return memory_id
 
-def get_execution(execution_id: str) -> Optional[dict]:
-    with SessionLocal() as session:
-        execution = session.query(Execution).filter(Execution.id == execution_id).first()
-        if execution:
-            return {
-                "id": execution.id,
-                "conversation_id": getattr(execution, "conversation_id", None),
-                "query": getattr(execution, "query", None),
-                "status": execution.status,
-                "started_at": getattr(execution, "started_at", None).isoformat() if getattr(execution, "started_at", None) else None,
-                "completed_at": getattr(execution, "completed_at", None).isoformat() if getattr(execution, "completed_at", None) else None,
-                "result": execution.result
-            }
-        return None
-
-def get_observability_events(limit: int = 100) -> List[dict]:
-    with SessionLocal() as session:
-        events = session.query(ObservabilityEvent).order_by(ObservabilityEvent.timestamp.desc()).limit(limit).all()
-        return [
-            {
-                "id": event.id,
-                "timestamp": event.timestamp.isoformat() if event.timestamp else None,
-                "event_type": event.event_type,
-                "agent_name": event.agent_name,
-                "message": event.data,
-                "level": None,
-                "execution_id": event.execution_id
-            } for event in events
-        ]
+async def create_memory_items(items: List[dict]) -> List[str]:
+    """Create several memory items (dicts with id, content, type, source) in one transaction.
+
+    Ids that already exist are skipped, so writing the same items again is a no-op.
+    """
+    def write():
+        now = datetime.utcnow()
+        with SessionLocal() as session:
+            session.execute(insert(Memory).prefix_with("OR IGNORE"), [
+                {
+                    "id": item["id"],
+                    "type": item["type"],
+                    "content": item["content"],
+                    "source": item.get("source"),
+                    "created_at": now,
+                    "updated_at": now,
+                    "is_deleted": False
+                } for item in items
+            ])
+            session.commit()
+    await db_write_executor.run(write)
+    return [item["id"] for item in items]
+
+async def add_pending_memories(items: List[dict]):
+    """Queue memory items (dicts with id, content, type, source) in the outbox."""
+    def write():
+        with SessionLocal() as session:
+            session.add_all([
+                PendingMemory(id=item["id"], type=item["type"], content=item["content"], source=item.get("source"), created_at=datetime.utcnow())
+                for item in items
+            ])
+            session.commit()
+    await db_write_executor.run(write)
+
+async def get_pending_memories(limit: int, max_attempts: int) -> List[dict]:
+    """Oldest outbox items that have been tried fewer than `max_attempts` times."""
+    def read():
+        with SessionLocal() as session:
+            pending = (
+                session.query(PendingMemory)
+                .filter(PendingMemory.attempts < max_attempts)
+                .order_by(PendingMemory.created_at)
+                .limit(limit)
+                .all()
+            )
+            return [
+                {
+                    "id": item.id,
+                    "type": item.type,
+                    "content": item.content,
+                    "source": item.source,
+                    "created_at": item.created_at
+                } for item in pending
+            ]
+    return await db_read_executor.run(read)
+
+async def delete_pending_memories(memory_ids: List[str]):
+    def write():
+        with SessionLocal() as session:
+            session.query(PendingMemory).filter(PendingMemory.id.in_(memory_ids)).delete(synchronize_session=False)
+            session.commit()
+    await db_write_executor.run(write)
+
+async def record_pending_memory_failure(memory_ids: List[str], error: str):
+    def write():
+        with SessionLocal() as session:
+            session.query(PendingMemory).filter(PendingMemory.id.in_(memory_ids)).update(
+                {PendingMemory.attempts: PendingMemory.attempts + 1, PendingMemory.last_error: error},
+                synchronize_session=False
+            )
+            session.commit()
+    await db_write_executor.run(write)
+
+async def get_pending_memory_stats(max_attempts: int) -> dict:
+    """Outbox size: items still to be written, items given up on, and the oldest waiting item."""
+    def read():
+        with SessionLocal() as session:
+            pending, oldest = (
+                session.query(func.count(PendingMemory.id), func.min(PendingMemory.created_at))
+                .filter(PendingMemory.attempts < max_attempts)
+                .one()
+            )
+            failed = session.query(func.count(PendingMemory.id)).filter(PendingMemory.attempts >= max_attempts).scalar()
+            return {"pending": pending, "failed": failed, "oldest_created_at": oldest}
+    return await db_read_executor.run(read)
+
+async def get_execution(execution_id: str) -> Optional[dict]:
+    def read():
+        with SessionLocal() as session:
+            execution = session.query(Execution).filter(Execution.id == execution_id).first()
+            if execution:
+                return {
+                    "id": execution.id,
+                    "conversation_id": getattr(execution, "conversation_id", None),
+                    "query": getattr(execution, "query", None),
+                    "status": execution.status,
+                    "started_at": getattr(execution, "started_at", None).isoformat() if getattr(execution, "started_at", None) else None,
+                    "completed_at": getattr(execution, "completed_at", None).isoformat() if getattr(execution, "completed_at", None) else None,
+                    "result": execution.result,
+                    "degraded": execution.degraded.split(",") if execution.degraded else []
+                }
+            return None
+    return await db_read_executor.run(read)
+
+def _observability_event_to_dict(event: ObservabilityEvent) -> dict:
+    return {
+        "id": event.id,
+        "timestamp": event.timestamp.isoformat() if event.timestamp else None,
+        "event_type": event.event_type,
+        "agent_name": event.agent_name,
+        "message": event.data,
+        "level": None,
+        "execution_id": event.execution_id
+    }
+
+async def get_observability_events(limit: int = 100) -> List[dict]:
+    def read():
+        with SessionLocal() as session:
+            events = session.query(ObservabilityEvent).order_by(ObservabilityEvent.timestamp.desc()).limit(limit).all()
+            return [_observability_event_to_dict(event) for event in events]
+    return await db_read_executor.run(read)
+
+async def get_execution_events(execution_id: str, after_id: int = 0) -> List[dict]:
+    """Events of one execution in insertion order, optionally only those after `after_id`."""
+    def read():
+        with SessionLocal() as session:
+            events = (
+                session.query(ObservabilityEvent)
+                .filter(ObservabilityEvent.execution_id == execution_id, ObservabilityEvent.id > after_id)
+                .order_by(ObservabilityEvent.id)
+                .all()
+            )
+            return [_observability_event_to_dict(event) for event in events]
+    return await db_read_executor.run(read)
 
 async def update_memory_item(memory_id: str, content: str):
-    async with async_session() as session:
-        await session.execute(
-            "UPDATE memories SET content = ?, updated_at = datetime('now') WHERE id = ?",
-            (content, memory_id)
-        )
-        await session.commit()
+    def write():
+        with SessionLocal() as session:
+            session.execute(
+                text("UPDATE memories SET content = :content, updated_at = datetime('now') WHERE id = :id"),
+                {"content": content, "id": memory_id}
+            )
+            session.commit()
+    await db_write_executor.run(write)
 
 async def delete_memory_item(memory_id: str):
-    async with async_session() as session:
-        await session.execute(
-            "UPDATE memories SET is_deleted = 1, updated_at = datetime('now') WHERE id = ?",
-            (memory_id,)
-        )
-        await session.commit()
+    def write():
+        with SessionLocal() as session:
+            session.execute(
+                text("UPDATE memories SET is_deleted = 1, updated_at = datetime('now') WHERE id = :id"),
+                {"id": memory_id}
+            )
+            session.commit()
+    await db_write_executor.run(write)
 
 
 
@@ -1,11 +1,15 @@
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.routers import chat, memory, agents, observability, feedback, guardrail, settings as settings_router
 from app.routers.chat_stream import router as chat_stream_router
 from app.config import settings
-from app.db.sqlite_client import init_db
+from app.db.sqlite_client import init_db, event_sink
 from app.db.chroma_client import init_chroma_collections
-from app.core.data_loader import hotload_data
+from app.core.memory_outbox import memory_outbox
+from app.utils.llm_gateway import llm_gateway
+from app.utils.embeddings import embedding_service
+from app.core.data_loader import hotload_data, hotload_progress
 import asyncio
 
 app = FastAPI(title="Sarthi - Collaborative Incident Co-Pilot", version="1.0.0")
@@ -33,13 +37,47 @@ app.include_router(settings_router.router, prefix="/api", tags=["settings"])
 async def startup_event():
     init_db()
     await init_chroma_collections()
-    # Hotload any static data under /data into Chroma for retrieval
-    await hotload_data()
+    # Write memories queued before the last shutdown, then keep writing new ones
+    memory_outbox.start()
+    # Hotload any static data under /data into Chroma for retrieval in the
+    # background so the API starts serving immediately; see /ready
+    app.state.hotload_task = asyncio.create_task(hotload_data())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    hotload_task = getattr(app.state, "hotload_task", None)
+    if hotload_task and not hotload_task.done():
+        hotload_task.cancel()
+    # Write queued memories; what doesn't finish in time is kept for the next start
+    await memory_outbox.close()
+    # Write out queued observability events
+    await asyncio.to_thread(event_sink.close)
+    # Write out embeddings still queued for the disk cache
+    await embedding_service.cache.flush()
+    await llm_gateway.close()
 
 @app.get("/")
 async def root():
     return {"message": "Welcome to Sarthi API"}
 
+@app.get("/ready")
+async def ready():
+    """Readiness probe with data loading progress.
+
+    With warmup_policy "reject" this returns 503 until the index is loaded;
+    with "serve" queries are answered from a partial index, so it is always 200.
+    """
+    accepting = hotload_progress.ready or settings.warmup_policy == "serve"
+    return JSONResponse(
+        status_code=200 if accepting else 503,
+        content={
+            "ready": accepting,
+            "index_ready": hotload_progress.ready,
+            "warmup_policy": settings.warmup_policy,
+            "index": hotload_progress.to_dict(),
+        },
+    )
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -3,6 +3,8 @@ from pydantic import BaseModel
 from typing import List, Dict, Any
 from app.services.ingestion_service import IngestionService
 from app.agents.self_service_agent import SelfServiceAgent
+from app.core.data_loader import hotload_progress
+from app.config import settings
 
 router = APIRouter()
 ingestion_service = IngestionService()
@@ -35,6 +37,8 @@ async def list_agents():
 
 @router.post("/self-service/run")
 async def run_self_service_agent(request: SelfServiceRequest):
+    if settings.warmup_policy == "reject" and not hotload_progress.ready:
+        raise HTTPException(status_code=503, detail="Document index is still loading, see /ready")
     try:
         agent = SelfServiceAgent()
         execution_id = await agent.run(request.query)
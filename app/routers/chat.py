@@ -3,6 +3,8 @@ from pydantic import BaseModel
 from typing import List, Optional
 from app.services.chat_service import ChatService
 from app.models.chat_models import ChatQuery, ChatResponse
+from app.core.data_loader import hotload_progress
+from app.config import settings
 
 router = APIRouter()
 chat_service = ChatService()
@@ -11,11 +13,15 @@ class QueryRequest(BaseModel):
     query: str
     attachments: Optional[List[str]] = []
     mode: str = "chat"
+    # Return immediately and stream the answer on /api/chat/stream/{execution_id}
+    stream: bool = False
 
 @router.post("/query", response_model=ChatResponse)
 async def submit_chat_query(request: QueryRequest):
+    if settings.warmup_policy == "reject" and not hotload_progress.ready:
+        raise HTTPException(status_code=503, detail="Document index is still loading, see /ready")
     try:
-        response = await chat_service.process_query(request.query, request.attachments, request.mode)
+        response = await chat_service.process_query(request.query, request.attachments, request.mode, request.stream)
         return response
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,89 +1,118 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Header
 from fastapi.responses import StreamingResponse
-from app.db.sqlite_client import log_observability_event, get_execution, get_observability_events
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+from app.core.event_bus import event_bus, TERMINAL_EVENTS
+from app.db.sqlite_client import event_sink, get_execution, get_execution_events
 import asyncio
 import json
 
 router = APIRouter()
 
-# Track which events have been sent per execution
-sent_event_ids = {}
+MAX_WAIT = 120  # Maximum time to wait for new events, in seconds
+KEEPALIVE_INTERVAL = 15  # Comment frames keep idle connections open through proxies
+POLL_INTERVAL = 0.5  # Database polling, only for executions the bus doesn't know
+SINK_FLUSH_TIMEOUT = 2  # Longest wait for queued events before replaying what is written
+
+
+def _sse(data: Dict[str, Any], event_id: int = None) -> str:
+    # Browsers send the last `id:` they saw as Last-Event-ID when reconnecting
+    prefix = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+def _final_frames(execution_id: str, final_response: str, event_id: int = None) -> Iterator[str]:
+    # Stream the response content, then the completion event; only the last
+    # frame carries the id so a reconnect in between gets both again
+    if final_response:
+        yield _sse({'type': 'response', 'final_response': final_response})
+    yield _sse({'status': 'completed', 'execution_id': execution_id}, event_id)
+
+
+def _event_frames(execution_id: str, event: Dict[str, Any]) -> Iterator[str]:
+    if event["event"] in TERMINAL_EVENTS:
+        yield from _final_frames(execution_id, event.get("final_response"), event["id"])
+        return
+    if event["event"] == "token":
+        yield _sse({"event": "token", "delta": event["delta"]}, event["id"])
+        return
+    if event["event"] == "stream_blocked":
+        yield _sse({"event": "stream_blocked", "final_response": event["final_response"]}, event["id"])
+        return
+    if event["event"] == "stream_reset":
+        yield _sse({"event": "stream_reset"}, event["id"])
+        return
+    # Format event for frontend
+    yield _sse({
+        "event": event["event"],
+        "agent": event.get("agent"),
+        "message": event.get("message"),
+        "timestamp": event.get("timestamp")
+    }, event["id"])
+
+
+def _parse_event_id(value: Optional[str]) -> int:
+    try:
+        return max(int(value), 0) if value else 0
+    except ValueError:
+        return 0
+
+
+def _result_text(result: Any) -> str:
+    try:
+        result_data = json.loads(result) if isinstance(result, str) else result
+        if isinstance(result_data, dict):
+            return result_data.get('final_response', '') or result_data.get('response', '')
+        return str(result_data)
+    except Exception:
+        return result or ''
+
 
 @router.get("/stream/{execution_id}")
-async def stream_chat_execution(execution_id: str):
-    """Stream real-time execution events and response via SSE."""
+async def stream_chat_execution(execution_id: str, last_event_id: Optional[str] = Header(None)):
+    """Stream real-time execution events and response via SSE.
+
+    Events are pushed from the in-process event bus. Each frame carries the
+    event id, and a reconnect with Last-Event-ID resumes after that event.
+    The database is only read when the bus can't replay the missed events,
+    e.g. when a client reconnects after a restart.
+    """
+    after_id = _parse_event_id(last_event_id)
 
     async def event_generator():
         """Generate SSE events for the execution."""
         # Send initial connection event
-        yield f"data: {json.dumps({'event': 'connected', 'execution_id': execution_id})}\n\n"
-
-        sent_event_ids[execution_id] = set()
-        max_wait = 120  # Maximum wait time in seconds
-        poll_interval = 0.5  # Poll every 500ms
-        elapsed = 0
-
-        while elapsed < max_wait:
-            try:
-                # Get current execution state
-                execution = get_execution(execution_id)
-                
-                if not execution:
-                    yield f"data: {json.dumps({'error': 'Execution not found'})}\n\n"
-                    break
-
-                # Get all observability events for this execution
-                all_events = get_observability_events(limit=100)
-                execution_events = [e for e in all_events if e.get('execution_id') == execution_id]
-
-                # Stream new events
-                for event in execution_events:
-                    event_key = f"{event.get('timestamp')}_{event.get('event_type')}_{event.get('agent_name')}"
-                    
-                    if event_key not in sent_event_ids[execution_id]:
-                        sent_event_ids[execution_id].add(event_key)
-                        
-                        # Format event for frontend
-                        event_data = {
-                            "event": event.get('event_type', 'unknown'),
-                            "agent": event.get('agent_name'),
-                            "message": event.get('message'),
-                            "timestamp": event.get('timestamp')
-                        }
-                        yield f"data: {json.dumps(event_data)}\n\n"
-
-                # Check if execution is complete
-                if execution['status'] in ['completed', 'failed']:
-                    # Stream final response
-                    if execution.get('result'):
-                        try:
-                            result_data = json.loads(execution['result']) if isinstance(execution['result'], str) else execution['result']
-                            if isinstance(result_data, dict):
-                                final_response = result_data.get('final_response', '') or result_data.get('response', '')
-                            else:
-                                final_response = str(result_data)
-                        except:
-                            final_response = execution.get('result', '')
-                        
-                        # Stream the response content
-                        if final_response:
-                            yield f"data: {json.dumps({'type': 'response', 'final_response': final_response})}\n\n"
-
-                    # Send completion event
-                    yield f"data: {json.dumps({'status': 'completed', 'execution_id': execution_id})}\n\n"
-                    break
-
-                # Wait before polling again
-                await asyncio.sleep(poll_interval)
-                elapsed += poll_interval
-
-            except Exception as e:
-                yield f"data: {json.dumps({'error': str(e)})}\n\n"
-                break
-
-        # Cleanup
-        if execution_id in sent_event_ids:
-            del sent_event_ids[execution_id]
+        yield _sse({'event': 'connected', 'execution_id': execution_id})
+
+        history, subscription = event_bus.subscribe(execution_id, after_id)
+        try:
+            if history is None:
+                async for frame in _replay_from_db(execution_id, after_id):
+                    yield frame
+                return
+
+            for event in history:
+                for frame in _event_frames(execution_id, event):
+                    yield frame
+                if event["event"] in TERMINAL_EVENTS:
+                    return
+
+            waited = 0
+            while waited < MAX_WAIT:
+                event = await subscription.get(timeout=KEEPALIVE_INTERVAL)
+                if event is None:
+                    waited += KEEPALIVE_INTERVAL
+                    yield ": keepalive\n\n"
+                    continue
+                for frame in _event_frames(execution_id, event):
+                    yield frame
+                if event["event"] in TERMINAL_EVENTS:
+                    return
+                if subscription.overflowed and subscription.queue.empty():
+                    # Events were skipped; the client resumes from its last id
+                    yield _sse({'error': 'Stream fell behind, reconnect to resume'})
+                    return
+        finally:
+            event_bus.unsubscribe(subscription)
 
     return StreamingResponse(
         event_generator(),
@@ -93,4 +122,41 @@ async def stream_chat_execution(execution_id: str):
             "Connection": "keep-alive",
             "Access-Control-Allow-Origin": "*",
         }
-    )
\ No newline at end of file
+    )
+
+
+async def _replay_from_db(execution_id: str, after_id: int = 0) -> AsyncIterator[str]:
+    """Stream an execution's events after `after_id` from the database, polling while it runs."""
+    last_id = after_id
+    elapsed = 0
+    while elapsed < MAX_WAIT:
+        try:
+            execution = await get_execution(execution_id)
+            if not execution:
+                yield _sse({'error': 'Execution not found'})
+                return
+
+            finished = execution['status'] in ['completed', 'failed']
+            if finished:
+                # Give the execution's last events a bounded chance to be written
+                await asyncio.to_thread(event_sink.flush, SINK_FLUSH_TIMEOUT)
+
+            for event in await get_execution_events(execution_id, after_id=last_id):
+                last_id = event["id"]
+                yield _sse({
+                    "event": event.get('event_type', 'unknown'),
+                    "agent": event.get('agent_name'),
+                    "message": event.get('message'),
+                    "timestamp": event.get('timestamp')
+                }, event["id"])
+
+            if finished:
+                for frame in _final_frames(execution_id, _result_text(execution.get('result'))):
+                    yield frame
+                return
+        except Exception as e:
+            yield _sse({'error': str(e)})
+            return
+
+        await asyncio.sleep(POLL_INTERVAL)
+        elapsed += POLL_INTERVAL
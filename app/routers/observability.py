@@ -1,6 +1,14 @@
 from fastapi import APIRouter, HTTPException
+from typing import Dict, Any
 from app.services.observability_service import ObservabilityService
 from app.models.observability_models import ObservabilitySummary
+from app.utils.embeddings import embedding_service
+from app.utils.response_cache import response_cache
+from app.utils.llm_gateway import llm_gateway
+from app.db.sqlite_client import event_sink, db_read_executor, db_write_executor
+from app.db.chroma_client import chroma_read_executor, chroma_write_executor
+from app.core.event_bus import event_bus
+from app.core.memory_outbox import memory_outbox
 
 router = APIRouter()
 observability_service = ObservabilityService()
@@ -12,4 +20,21 @@ async def get_dashboard_summary(execution_id: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/metrics")
+async def get_runtime_metrics() -> Dict[str, Any]:
+    """Runtime counters for caches and background workers."""
+    return {
+        "embedding_cache": embedding_service.cache.get_stats(),
+        "embedding_batcher": embedding_service.batcher.get_stats(),
+        "observability_events": event_sink.get_stats(),
+        "event_bus": event_bus.get_stats(),
+        "memory_outbox": await memory_outbox.get_stats(),
+        "response_cache": response_cache.get_stats(),
+        "llm_gateway": llm_gateway.get_stats(),
+        "executors": {
+            executor.name: executor.get_stats()
+            for executor in (db_read_executor, db_write_executor, chroma_read_executor, chroma_write_executor)
+        }
+    }
+
 # Note: Live stream would use SSE, implemented separately
\ No newline at end of file
@@ -1,35 +1,55 @@
-from app.core.orchestrator import Orchestrator
+import asyncio
+import uuid
+from app.core.orchestrator import orchestrator
+from app.core.event_bus import event_bus
 from app.models.chat_models import ChatQuery, ChatResponse
-from app.agents.memory_agent import MemoryAgent
 
 class ChatService:
     def __init__(self):
-        self.orchestrator = Orchestrator()
-        self.memory_agent = MemoryAgent()
+        self.orchestrator = orchestrator
+        # Keep references so background runs aren't garbage collected
+        self._background_tasks = set()
+
+    async def process_query(self, query: str, attachments: list, mode: str, stream: bool = False) -> ChatResponse:
+        """Answer a query.
+
+        With `stream`, the pipeline runs in the background and this returns
+        at once with status "running"; the client follows the execution
+        (including generated tokens) on /api/chat/stream/{execution_id}.
+        """
+        if stream:
+            return self._start_streaming_query(query, attachments, mode)
 
-    async def process_query(self, query: str, attachments: list, mode: str) -> ChatResponse:
         result = await self.orchestrator.run_query(query, attachments, mode)
         orchestrator_result = result.get("result", {})
         response_text = orchestrator_result.get("final_response", "")
-        
-        # **IMPORTANT**: Immediately store this conversation turn as episodic memory
-        # so that future queries can retrieve context about what the user told us
-        if query and response_text:
-            try:
-                # Store the complete conversation turn for future recall
-                conversation_memory = f"User: {query}\nAssistant: {response_text}"
-                await self.memory_agent.write_memory(
-                    content=conversation_memory,
-                    memory_type="conversation",
-                    source="chat_interaction"
-                )
-            except Exception as e:
-                # Log but don't fail the response if memory write fails
-                print(f"Warning: Failed to store conversation memory: {e}")
-        
+
         return ChatResponse(
             conversation_id=result["conversation_id"],
             execution_id=result["execution_id"],
             response=response_text,
             status="completed"
-        )
\ No newline at end of file
+        )
+
+    def _start_streaming_query(self, query: str, attachments: list, mode: str) -> ChatResponse:
+        execution_id = str(uuid.uuid4())
+        conversation_id = str(uuid.uuid4())
+        # Streams opened before the first event wait for it
+        event_bus.open(execution_id)
+
+        async def run():
+            try:
+                await self.orchestrator.run_query(query, attachments, mode, execution_id=execution_id, conversation_id=conversation_id, stream=True)
+            except Exception as e:
+                # run_query already marked the execution failed
+                print(f"Warning: Streaming query {execution_id} failed: {e}")
+
+        task = asyncio.create_task(run())
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+        return ChatResponse(
+            conversation_id=conversation_id,
+            execution_id=execution_id,
+            status="running"
+        )
@@ -1,11 +1,9 @@
 from app.db.sqlite_client import get_memory_items
 from app.agents.memory_agent import MemoryAgent
-import openai
-from app.config import settings
+from app.utils.llm_gateway import llm_gateway
 
 class FeedbackService:
     def __init__(self):
-        openai.api_key = settings.openai_api_key
         self.memory_agent = MemoryAgent()
 
     async def process_feedback(self, execution_id: str, rating: str, comment: str = None):
@@ -28,9 +26,9 @@ class FeedbackService:
         Provide a concise learning point.
         """
 
-        response = await openai.ChatCompletion.acreate(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": analysis_prompt}],
+        response = await llm_gateway.chat(
+            "gpt-3.5-turbo",
+            [{"role": "user", "content": analysis_prompt}],
             max_tokens=150
         )
 
@@ -0,0 +1,85 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+
+class BoundedExecutor:
+    """Thread pool for blocking calls made from async code.
+
+    `run` awaits `fn(*args, **kwargs)` on one of `max_workers` threads, so
+    the event loop keeps serving other requests meanwhile. At most
+    `max_queue_size` calls wait for a free thread; further callers wait on
+    the event loop until one finishes, so a burst applies backpressure
+    instead of growing an unbounded queue. Keeps counters for /metrics.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue_size: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._slots = asyncio.Semaphore(max_workers + max_queue_size)
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._wait_seconds = 0.0
+        self._run_seconds = 0.0
+        self.stats = {"submitted": 0, "completed": 0, "failed": 0, "backpressured": 0, "max_queue_depth": 0}
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        if self._slots.locked():
+            self.stats["backpressured"] += 1
+        async with self._slots:
+            submitted = time.perf_counter()
+            with self._lock:
+                self._queued += 1
+                self.stats["submitted"] += 1
+                self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], self._queued)
+
+            def call():
+                started = time.perf_counter()
+                with self._lock:
+                    self._queued -= 1
+                    self._running += 1
+                    self._wait_seconds += started - submitted
+                try:
+                    result = fn(*args, **kwargs)
+                except BaseException:
+                    self._finish(started, "failed")
+                    raise
+                self._finish(started, "completed")
+                return result
+
+            future = self._executor.submit(call)
+            try:
+                return await asyncio.wrap_future(future)
+            except asyncio.CancelledError:
+                if future.cancelled():
+                    # Cancelled before a thread picked it up
+                    with self._lock:
+                        self._queued -= 1
+                raise
+
+    def _finish(self, started: float, outcome: str):
+        with self._lock:
+            self._running -= 1
+            self._run_seconds += time.perf_counter() - started
+            self.stats[outcome] += 1
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            done = self.stats["completed"] + self.stats["failed"]
+            started = done + self._running
+            return {
+                **self.stats,
+                "workers": self.max_workers,
+                "queue_depth": self._queued,
+                "running": self._running,
+                "avg_wait_ms": round(self._wait_seconds / started * 1000, 2) if started else 0.0,
+                "avg_run_ms": round(self._run_seconds / done * 1000, 2) if done else 0.0,
+            }
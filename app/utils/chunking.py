@@ -0,0 +1,81 @@
+from typing import Callable, Iterable, Iterator, Tuple
+
+BLOCK_SIZE = 1 << 20  # characters read per block
+
+
+def iter_file_blocks(path, block_size: int = BLOCK_SIZE, encoding: str = "utf-8") -> Iterator[str]:
+    """Read a text file incrementally, one block of characters at a time."""
+    with open(path, "r", encoding=encoding) as f:
+        for block in iter(lambda: f.read(block_size), ""):
+            yield block
+
+
+def iter_chunks(blocks: Iterable[str], chunk_size: int, overlap: int = 0, split_on_boundary: bool = False) -> Iterator[Tuple[str, int, int]]:
+    """Split a stream of text blocks into chunks without holding the whole text.
+
+    Yields (chunk, start, end) with character offsets into the full text.
+    With `split_on_boundary`, chunks are cut at the last newline (or else
+    space) before `chunk_size`, stripped, and empty chunks are dropped.
+    Otherwise chunks are exactly `chunk_size` characters and consecutive
+    chunks share `overlap` characters. Memory stays within a block plus a chunk.
+    """
+    if not 0 <= overlap < chunk_size:
+        raise ValueError("overlap must be smaller than chunk_size")
+
+    buffer = ""
+    pos = 0  # start of the unconsumed text in buffer
+    buffer_start = 0  # offset of buffer[0] in the full text
+
+    def cut(at_end: bool) -> int:
+        end = min(pos + chunk_size, len(buffer))
+        if split_on_boundary and not at_end:
+            sep = buffer.rfind("\n", pos, end)
+            if sep <= pos:
+                sep = buffer.rfind(" ", pos, end)
+            if sep > pos:
+                end = sep
+        return end
+
+    def emit(end: int) -> Iterator[Tuple[str, int, int]]:
+        chunk = buffer[pos:end]
+        if split_on_boundary:
+            chunk = chunk.strip()
+            if not chunk:
+                return
+        yield chunk, buffer_start + pos, buffer_start + end
+
+    for block in blocks:
+        # Drop consumed text only once per block to keep slicing linear
+        buffer = buffer[pos:] + block
+        buffer_start += pos
+        pos = 0
+        # Only cut while more text follows the chunk, so boundary search and
+        # the final chunk behave as if the whole text were available
+        while len(buffer) - pos > chunk_size:
+            end = cut(at_end=False)
+            yield from emit(end)
+            pos = end if split_on_boundary else end - overlap
+
+    while pos < len(buffer):
+        end = cut(at_end=True)
+        yield from emit(end)
+        pos = end
+
+
+def mask_blocks(blocks: Iterable[str], mask: Callable[[str], str]) -> Iterator[str]:
+    """Apply a line-oriented masking function to a block stream.
+
+    Blocks are cut at the last newline (or, for very long lines, the last
+    space) so a pattern is never split across two calls to `mask`.
+    """
+    carry = ""
+    for block in blocks:
+        carry += block
+        cut = carry.rfind("\n") + 1
+        if not cut and len(carry) > BLOCK_SIZE:
+            cut = carry.rfind(" ") + 1
+        if cut:
+            yield mask(carry[:cut])
+            carry = carry[cut:]
+    if carry:
+        yield mask(carry)
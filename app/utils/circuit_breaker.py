@@ -0,0 +1,82 @@
+import threading
+import time
+from typing import Any, Dict
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """Stops calling an upstream that keeps failing.
+
+    After `failure_threshold` consecutive failures the breaker opens and
+    `allow_request` refuses calls, so callers go straight to their fallback
+    instead of waiting for another timeout. After `recovery_timeout`
+    seconds it is half-open: one probe call is let through, and its outcome
+    closes the breaker again or reopens it for another `recovery_timeout`.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, recovery_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self.stats = {"opened": 0, "rejected": 0, "probes": 0}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+                return HALF_OPEN
+            return self._state
+
+    @property
+    def is_open(self) -> bool:
+        """Whether calls are currently refused (open and not yet due for a probe)."""
+        return self.state == OPEN
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+                self._state = HALF_OPEN
+            if self._state == HALF_OPEN and not self._probing:
+                self._probing = True
+                self.stats["probes"] += 1
+                return True
+            self.stats["rejected"] += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self.stats["opened"] += 1
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    def release(self):
+        """End a call that says nothing about the upstream (e.g. cancelled), so another probe can be made."""
+        with self._lock:
+            self._probing = False
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "state": self.state, "consecutive_failures": self._failures}
@@ -0,0 +1,163 @@
+import asyncio
+import hashlib
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+from app.db.sqlite_client import db_read_executor, db_write_executor
+
+# How long new vectors are collected before they are written in one commit
+WRITE_DELAY = 0.05
+
+
+class EmbeddingCache:
+    """Two-tier embedding cache: a bounded in-memory LRU backed by a SQLite file.
+
+    Entries are keyed by a hash of the model name and the text, so switching
+    models never returns stale vectors. Lookups check memory first, then disk,
+    and disk hits are promoted into memory.
+
+    Disk reads run on the SQLite read threads and writes on the SQLite write
+    thread, so the event loop never waits on the file. New vectors are
+    served from memory at once and written to disk in the background, with
+    one commit for everything queued within WRITE_DELAY.
+    """
+
+    def __init__(self, path: str, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Rows waiting for the next disk write, by key
+        self._pending: Dict[str, tuple] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "writes": 0, "commits": 0}
+
+        # The file is opened on first disk access, so importing creates nothing
+        self.path = path
+        self._write_conn: Optional[sqlite3.Connection] = None
+        self._read_conn: Optional[sqlite3.Connection] = None
+        self._open_lock = threading.Lock()
+        self._read_lock = threading.Lock()
+
+    @staticmethod
+    def make_key(model: str, text: str) -> str:
+        return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+    async def get_many(self, model: str, texts: List[str]) -> List[Optional[List[float]]]:
+        """Return cached vectors in input order, with None for misses."""
+        keys = [self.make_key(model, text) for text in texts]
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        disk_lookup = {}
+        with self._lock:
+            for i, key in enumerate(keys):
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    results[i] = self._memory[key]
+                    self.stats["memory_hits"] += 1
+                elif key in self._pending:
+                    # Evicted from memory before its disk write
+                    results[i] = array("f", self._pending[key][2]).tolist()
+                    self.stats["memory_hits"] += 1
+                else:
+                    disk_lookup.setdefault(key, []).append(i)
+
+        if disk_lookup:
+            rows = await db_read_executor.run(self._read_vectors, list(disk_lookup))
+            with self._lock:
+                for key, blob in rows:
+                    vector = array("f", blob).tolist()
+                    self._remember(key, vector)
+                    for i in disk_lookup[key]:
+                        results[i] = vector
+                        self.stats["disk_hits"] += 1
+
+        with self._lock:
+            self.stats["misses"] += sum(1 for vector in results if vector is None)
+        return results
+
+    def put_many(self, model: str, texts: List[str], vectors: List[List[float]]):
+        """Store vectors in memory now and queue them for the next disk write."""
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                key = self.make_key(model, text)
+                self._remember(key, vector)
+                self._pending[key] = (key, model, array("f", vector).tobytes())
+        if self._flush_task is None:
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush())
+            # Keep a reference so the task isn't garbage collected mid-write
+            self._tasks.add(self._flush_task)
+            self._flush_task.add_done_callback(self._tasks.discard)
+
+    async def flush(self):
+        """Wait until every queued vector is on disk (e.g. before shutdown)."""
+        while self._flush_task is not None:
+            await asyncio.shield(self._flush_task)
+
+    async def _flush(self):
+        try:
+            # Vectors queued while a write runs go out with the next one
+            while self._pending:
+                await asyncio.sleep(WRITE_DELAY)
+                with self._lock:
+                    rows, self._pending = list(self._pending.values()), {}
+                try:
+                    await db_write_executor.run(self._write_rows, rows)
+                except Exception as e:
+                    print(f"Warning: Failed to write {len(rows)} embeddings to the cache: {e}")
+        finally:
+            self._flush_task = None
+
+    def _open(self):
+        with self._open_lock:
+            if self._write_conn is not None:
+                return
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            write_conn = sqlite3.connect(self.path, check_same_thread=False)
+            # WAL lets lookups read while a write is committing
+            write_conn.execute("PRAGMA journal_mode=WAL")
+            write_conn.execute("PRAGMA synchronous=NORMAL")
+            write_conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, model TEXT NOT NULL, vector BLOB NOT NULL)"
+            )
+            write_conn.commit()
+            self._read_conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._write_conn = write_conn
+
+    def _read_vectors(self, keys: List[str]) -> List[tuple]:
+        self._open()
+        placeholders = ",".join("?" * len(keys))
+        with self._read_lock:
+            return self._read_conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", keys
+            ).fetchall()
+
+    def _write_rows(self, rows: List[tuple]):
+        self._open()
+        self._write_conn.executemany("INSERT OR REPLACE INTO embeddings (key, model, vector) VALUES (?, ?, ?)", rows)
+        self._write_conn.commit()
+        with self._lock:
+            self.stats["writes"] += len(rows)
+            self.stats["commits"] += 1
+
+    def _remember(self, key: str, vector: List[float]):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+            lookups = hits + self.stats["misses"]
+            return {
+                **self.stats,
+                "hits": hits,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "pending_writes": len(self._pending),
+                "max_entries": self.max_entries,
+            }
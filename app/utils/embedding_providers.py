@@ -0,0 +1,92 @@
+import re
+import zlib
+import numpy as np
+from typing import List
+from app.config import settings
+from app.utils.llm_gateway import LLMGateway, llm_gateway
+
+# Vector sizes of OpenAI embedding models at their default dimensions
+OPENAI_EMBEDDING_DIMENSIONS = {
+    "text-embedding-ada-002": 1536,
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+}
+
+
+class EmbeddingProvider:
+    """Interface for embedding backends used by EmbeddingService."""
+
+    # Identifies the vector space; part of the embedding cache key
+    model: str = ""
+    dimension: int = 0
+    # Remote providers go through the cache and the micro-batcher; local ones
+    # are cheaper to recompute than to look up
+    remote: bool = False
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        raise NotImplementedError
+
+
+class OpenAIEmbeddingProvider(EmbeddingProvider):
+    """Embeddings from the OpenAI API, through the shared LLM gateway.
+
+    The dimension starts from the model's known size (1536 for unknown
+    models) and is taken from the first response, so it always matches the
+    vectors the API actually returns.
+    """
+
+    remote = True
+
+    def __init__(self, model: str, gateway: LLMGateway = None):
+        self.model = model
+        self.dimension = OPENAI_EMBEDDING_DIMENSIONS.get(model, 1536)
+        self.gateway = gateway or llm_gateway
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        vectors = await self.gateway.embed(self.model, texts)
+        if vectors:
+            self.dimension = len(vectors[0])
+        return vectors
+
+
+class HashingEmbeddingProvider(EmbeddingProvider):
+    """Local CPU embedder using signed feature hashing of words and word bigrams.
+
+    Needs no network or model files and is deterministic across processes, so
+    vectors stay valid after restarts. Texts that share vocabulary land close
+    together, which is enough for keyword-heavy runbook and ticket search.
+    """
+
+    _token_pattern = re.compile(r"\w+")
+
+    def __init__(self, dimension: int = 384):
+        self.model = f"hashing-{dimension}"
+        self.dimension = dimension
+
+    def embed_text(self, text: str) -> List[float]:
+        tokens = self._token_pattern.findall(text.lower())
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        if not features:
+            return [0.0] * self.dimension
+
+        hashes = np.fromiter((zlib.crc32(f.encode("utf-8")) for f in features), dtype=np.uint64, count=len(features))
+        indices = (hashes % self.dimension).astype(np.intp)
+        # The top hash bit picks the sign so collisions tend to cancel out
+        signs = np.where(hashes & 0x80000000, -1.0, 1.0)
+        vector = np.bincount(indices, weights=signs, minlength=self.dimension)
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector /= norm
+        return vector.tolist()
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed_text(text) for text in texts]
+
+
+def create_embedding_provider() -> EmbeddingProvider:
+    """Build the provider selected by `settings.embedding_provider`."""
+    if settings.embedding_provider == "openai":
+        return OpenAIEmbeddingProvider(settings.embedding_model)
+    if settings.embedding_provider == "hashing":
+        return HashingEmbeddingProvider(settings.embedding_dimension)
+    raise ValueError(f"Unknown embedding provider: {settings.embedding_provider}")
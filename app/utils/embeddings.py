@@ -1,36 +1,135 @@
-import openai
-from typing import List
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
 from app.config import settings
+from app.utils.embedding_cache import EmbeddingCache
+from app.utils.embedding_providers import EmbeddingProvider, create_embedding_provider
+
+class EmbeddingBatcher:
+    """Coalesces embedding requests from concurrent callers into batched API calls.
+
+    Texts queued within `window_ms` of each other are sent together, up to
+    `max_batch_size` texts and roughly `max_batch_tokens` tokens per request.
+    A full batch is sent right away without waiting for the window.
+    """
+
+    def __init__(self, embed_batch: Callable[[List[str]], Awaitable[List[List[float]]]], window_ms: float, max_batch_size: int, max_batch_tokens: int):
+        self.embed_batch = embed_batch
+        self.window = window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._pending_tokens = 0
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        # Keep references so in-flight batches aren't garbage collected
+        self._tasks: Set[asyncio.Task] = set()
+        self.stats = {"requests": 0, "batches": 0, "texts": 0, "failed_batches": 0}
+
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        # Roughly four characters per token for English text
+        return len(text) // 4 + 1
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        """Queue texts for the next batch and wait for their vectors."""
+        loop = asyncio.get_running_loop()
+        futures = []
+        self.stats["requests"] += 1
+        for text in texts:
+            tokens = self.estimate_tokens(text)
+            if self._pending and self._pending_tokens + tokens > self.max_batch_tokens:
+                self._send_pending()
+            future = loop.create_future()
+            self._pending.append((text, future))
+            self._pending_tokens += tokens
+            futures.append(future)
+            if len(self._pending) >= self.max_batch_size or self._pending_tokens >= self.max_batch_tokens:
+                self._send_pending()
+
+        if self._pending and self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._send_pending)
+        return list(await asyncio.gather(*futures))
+
+    def _send_pending(self):
+        if self._flush_handle is not None:
+            # A batch sent early must not cut the next batch's window short
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+        batch, self._pending, self._pending_tokens = self._pending, [], 0
+        task = asyncio.get_running_loop().create_task(self._send(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch: List[Tuple[str, asyncio.Future]]):
+        # Identical texts from different callers are embedded once
+        unique_texts = list(dict.fromkeys(text for text, _ in batch))
+        self.stats["batches"] += 1
+        self.stats["texts"] += len(unique_texts)
+        try:
+            vectors = dict(zip(unique_texts, await self.embed_batch(unique_texts)))
+        except Exception as e:
+            self.stats["failed_batches"] += 1
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for text, future in batch:
+            if not future.done():
+                future.set_result(vectors[text])
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "avg_batch_size": round(self.stats["texts"] / self.stats["batches"], 2) if self.stats["batches"] else 0.0,
+            "pending": len(self._pending),
+        }
 
 class EmbeddingService:
-    """Service for generating embeddings using OpenAI."""
+    """Service for generating embeddings through the configured provider.
+
+    Remote providers are fronted by a two-tier cache and the micro-batcher.
+    """
 
-    def __init__(self):
-        self.client = openai.AsyncOpenAI(api_key=settings.openai_api_key)
+    def __init__(self, provider: EmbeddingProvider = None):
+        self.provider = provider or create_embedding_provider()
+        self.model = self.provider.model
+        self.cache = EmbeddingCache(settings.embedding_cache_path, settings.embedding_cache_size)
+        self.batcher = EmbeddingBatcher(
+            self.provider.embed,
+            window_ms=settings.embedding_batch_window_ms,
+            max_batch_size=settings.embedding_max_batch_size,
+            max_batch_tokens=settings.embedding_max_batch_tokens,
+        )
 
     async def generate_embedding(self, text: str) -> List[float]:
         """Generate embedding for a single text."""
-        try:
-            response = await self.client.embeddings.create(
-                input=text,
-                model="text-embedding-ada-002"
-            )
-            return response.data[0].embedding
-        except Exception as e:
-            print(f"Embedding error: {e}")
-            return [0.0] * 1536  # Fallback for ada-002
+        return (await self.generate_embeddings([text]))[0]
 
     async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
-        """Generate embeddings for multiple texts."""
+        """Generate embeddings for multiple texts.
+
+        Cache misses go through the batcher, which shares API requests with
+        other callers embedding at the same time.
+        """
+        if not self.provider.remote:
+            return await self.provider.embed(texts)
+
+        embeddings = await self.cache.get_many(self.model, texts)
+        # Deduplicate misses so repeated chunks are embedded once
+        missing = list(dict.fromkeys(text for text, embedding in zip(texts, embeddings) if embedding is None))
+        if not missing:
+            return embeddings
+
         try:
-            response = await self.client.embeddings.create(
-                input=texts,
-                model="text-embedding-ada-002"
-            )
-            return [data.embedding for data in response.data]
+            fetched = dict(zip(missing, await self.batcher.embed(missing)))
+            self.cache.put_many(self.model, missing, list(fetched.values()))
         except Exception as e:
             print(f"Batch embedding error: {e}")
-            return [[0.0] * 1536 for _ in texts]
+            # Zero vectors mark the failure for callers; they are not cached
+            fetched = {text: [0.0] * self.provider.dimension for text in missing}
+
+        return [embedding if embedding is not None else fetched[text] for text, embedding in zip(texts, embeddings)]
 
 # Global instance
 embedding_service = EmbeddingService()
@@ -41,4 +140,4 @@ async def get_embedding(text: str) -> List[float]:
 
 async def get_embeddings(texts: List[str]) -> List[List[float]]:
     """Convenience function for batch embeddings."""
-    return await embedding_service.generate_embeddings(texts)
\ No newline at end of file
+    return await embedding_service.generate_embeddings(texts)
@@ -0,0 +1,136 @@
+import queue
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+# Tells the writer thread to stop once everything before it is written
+_STOP = object()
+
+
+class EventSink:
+    """Non-blocking sink that writes events in batches from a background thread.
+
+    `emit` only enqueues, so callers on the event loop never wait on the
+    database. The writer collects up to `batch_size` events, waiting at most
+    `flush_interval_ms` after the first one, and hands them to `write_batch`
+    in one call. The queue holds at most `max_queue_size` events; under
+    overload the "drop" policy discards new events once the queue is full,
+    while "sample" starts keeping only `sample_rate` of "info" events once
+    it is half full; other levels are only dropped when it is full. `flush`
+    waits for the events queued before it was called, not for later ones.
+    Call `close` on shutdown to write what is queued.
+    """
+
+    def __init__(self, write_batch: Callable[[List[Dict[str, Any]]], None], max_queue_size: int, batch_size: int, flush_interval_ms: float, overload_policy: str = "sample", sample_rate: float = 0.1):
+        if overload_policy not in ("drop", "sample"):
+            raise ValueError(f"Unknown overload policy: {overload_policy}")
+        self.write_batch = write_batch
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.overload_policy = overload_policy
+        self.sample_rate = sample_rate
+        self._queue: queue.Queue = queue.Queue(max_queue_size)
+        self._thread = None
+        self._lock = threading.Lock()
+        # Guards the enqueued/processed counts that `flush` waits on
+        self._progress = threading.Condition()
+        self._processed = 0
+        self._closed = False
+        self.stats = {"enqueued": 0, "written": 0, "dropped": 0, "sampled_out": 0, "batches": 0, "failed_batches": 0}
+
+    def emit(self, event: Dict[str, Any]) -> bool:
+        """Queue an event for writing; returns False if it was dropped or sampled out."""
+        if self._closed:
+            # Nothing drains the queue any more; write directly
+            self._write([event])
+            return True
+        self._ensure_started()
+        if (self.overload_policy == "sample" and event.get("level", "info") == "info"
+                and self._queue.qsize() >= self._queue.maxsize // 2 and random.random() >= self.sample_rate):
+            self.stats["sampled_out"] += 1
+            return False
+        with self._progress:
+            try:
+                self._queue.put_nowait(event)
+            except queue.Full:
+                self.stats["dropped"] += 1
+                return False
+            self.stats["enqueued"] += 1
+        return True
+
+    def flush(self, timeout: float = None) -> bool:
+        """Block until the events queued so far have been written, or `timeout` passes.
+
+        Returns False on timeout. Events emitted while waiting are not waited for.
+        """
+        if self._thread is None:
+            return True
+        with self._progress:
+            target = self.stats["enqueued"]
+            return self._progress.wait_for(lambda: self._processed >= target, timeout)
+
+    def close(self, timeout: float = 5.0):
+        """Write queued events and stop the writer thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+        if thread:
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "queue_depth": self._queue.qsize(),
+            "avg_batch_size": round(self.stats["written"] / self.stats["batches"], 2) if self.stats["batches"] else 0.0,
+        }
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="event-sink", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while batch[-1] is not _STOP and len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            if batch[-1] is _STOP:
+                stopping = True
+                batch.pop()
+            if batch:
+                self._write(batch)
+                self._mark_processed(len(batch))
+        # Events queued after the stop marker
+        while True:
+            try:
+                remaining = [self._queue.get_nowait()]
+            except queue.Empty:
+                break
+            self._write(remaining)
+            self._mark_processed(1)
+
+    def _mark_processed(self, count: int):
+        with self._progress:
+            self._processed += count
+            self._progress.notify_all()
+
+    def _write(self, batch: List[Dict[str, Any]]):
+        try:
+            self.write_batch(batch)
+        except Exception as e:
+            self.stats["failed_batches"] += 1
+            print(f"Warning: Failed to write {len(batch)} events: {e}")
+            return
+        self.stats["batches"] += 1
+        self.stats["written"] += len(batch)
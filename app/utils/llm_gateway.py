@@ -0,0 +1,206 @@
+import asyncio
+import random
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+import httpx
+import openai
+from app.config import settings
+from app.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+# Errors worth another attempt: throttling, timeouts, dropped connections and 5xx
+RETRYABLE_ERRORS = (openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError, openai.InternalServerError)
+# Errors that fail every request until someone fixes the key, permissions or model name
+MISCONFIGURATION_ERRORS = (openai.AuthenticationError, openai.PermissionDeniedError, openai.NotFoundError)
+
+
+class LLMGateway:
+    """Shared entry point for every OpenAI call (chat, streaming chat, embeddings).
+
+    Owns one long-lived AsyncOpenAI client whose connection pool keeps TLS
+    connections alive between calls. Requests per model are limited to
+    `max_concurrency` (or the model's entry in `model_concurrency`) so a
+    burst queues here instead of hitting provider rate limits. Failed
+    requests that are worth retrying are retried up to `max_retries` times
+    with full-jitter exponential backoff, honouring Retry-After when the
+    provider sends one. The client and semaphores belong to the event loop
+    that first used them and are recreated for a new loop (e.g. in scripts
+    that call asyncio.run more than once).
+
+    Chat and embedding calls each go through a circuit breaker. A request
+    that still fails with a retryable error after its retries, or fails
+    because of a bad key, permissions or model name, counts as a failure;
+    once a breaker opens, calls raise CircuitOpenError at once so callers
+    fall back without waiting on a provider that is down or misconfigured.
+    Other errors (e.g. a bad request) leave the breaker as it was.
+    """
+
+    def __init__(self, api_key: str, max_connections: int, max_keepalive_connections: int, max_concurrency: int, model_concurrency: Dict[str, int] = None, timeout: float = 60.0, max_retries: int = 3, retry_base_delay: float = 0.5, retry_max_delay: float = 8.0, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.api_key = api_key
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.max_concurrency = max_concurrency
+        self.model_concurrency = model_concurrency or {}
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.breakers = {
+            upstream: CircuitBreaker(upstream, failure_threshold, recovery_timeout)
+            for upstream in ("chat", "embeddings")
+        }
+        self._client: Optional[openai.AsyncOpenAI] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._in_flight: Dict[str, int] = {}
+        self._waiting: Dict[str, int] = {}
+        self.stats = {"requests": 0, "retries": 0, "failures": 0, "throttled": 0, "short_circuited": 0}
+
+    @property
+    def client(self) -> openai.AsyncOpenAI:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            self._client = openai.AsyncOpenAI(
+                api_key=self.api_key,
+                # Retries are done here, under the model's concurrency limit
+                max_retries=0,
+                timeout=httpx.Timeout(self.timeout, connect=min(self.timeout, 10.0)),
+                http_client=httpx.AsyncClient(limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                )),
+            )
+            self._loop = loop
+            self._semaphores = {}
+        return self._client
+
+    async def chat(self, model: str, messages: List[Dict[str, Any]], **kwargs) -> Any:
+        """Create a chat completion."""
+        return await self._call("chat", model, lambda: self.client.chat.completions.create(model=model, messages=messages, **kwargs))
+
+    @asynccontextmanager
+    async def stream_chat(self, model: str, messages: List[Dict[str, Any]], **kwargs) -> AsyncIterator[Any]:
+        """Create a streaming chat completion and yield the chunk stream.
+
+        Opening the stream is retried; a stream that fails midway is not. The
+        model's concurrency slot is held until the block exits, which also
+        closes the connection if the stream was not read to the end.
+        """
+        self._check_breaker("chat")
+        async with self._slot(model):
+            client = self.client
+            stream = await self._with_retries("chat", lambda: client.chat.completions.create(model=model, messages=messages, stream=True, **kwargs))
+            try:
+                yield stream
+            finally:
+                await stream.response.aclose()
+
+    async def embed(self, model: str, texts: List[str]) -> List[List[float]]:
+        response = await self._call("embeddings", model, lambda: self.client.embeddings.create(input=texts, model=model))
+        return [data.embedding for data in response.data]
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "in_flight": {model: count for model, count in self._in_flight.items() if count},
+            "waiting": {model: count for model, count in self._waiting.items() if count},
+            "breakers": {upstream: breaker.get_stats() for upstream, breaker in self.breakers.items()},
+        }
+
+    @asynccontextmanager
+    async def _slot(self, model: str) -> AsyncIterator[None]:
+        """Hold one of the model's concurrent request slots."""
+        # Accessing the client first makes sure semaphores belong to the running loop
+        self.client
+        semaphore = self._semaphores.get(model)
+        if semaphore is None:
+            semaphore = self._semaphores[model] = asyncio.Semaphore(self.model_concurrency.get(model, self.max_concurrency))
+        self._waiting[model] = self._waiting.get(model, 0) + 1
+        try:
+            await semaphore.acquire()
+        finally:
+            self._waiting[model] -= 1
+        self._in_flight[model] = self._in_flight.get(model, 0) + 1
+        try:
+            yield
+        finally:
+            self._in_flight[model] -= 1
+            semaphore.release()
+
+    def _check_breaker(self, upstream: str):
+        # Fail before queueing for a slot rather than after
+        if self.breakers[upstream].is_open:
+            self.stats["short_circuited"] += 1
+            raise CircuitOpenError(f"{upstream} circuit is open")
+
+    async def _call(self, upstream: str, model: str, request) -> Any:
+        self._check_breaker(upstream)
+        async with self._slot(model):
+            return await self._with_retries(upstream, request)
+
+    async def _with_retries(self, upstream: str, request) -> Any:
+        breaker = self.breakers[upstream]
+        if not breaker.allow_request():
+            self.stats["short_circuited"] += 1
+            raise CircuitOpenError(f"{upstream} circuit is open")
+        try:
+            result = await self._retry(request)
+        except (*RETRYABLE_ERRORS, *MISCONFIGURATION_ERRORS):
+            breaker.record_failure()
+            raise
+        except BaseException:
+            # Cancelled, or a problem with this request only; says nothing
+            # about the provider, so just free a half-open probe
+            breaker.release()
+            raise
+        breaker.record_success()
+        return result
+
+    async def _retry(self, request) -> Any:
+        attempt = 0
+        while True:
+            self.stats["requests"] += 1
+            try:
+                return await request()
+            except RETRYABLE_ERRORS as e:
+                if isinstance(e, openai.RateLimitError):
+                    self.stats["throttled"] += 1
+                if attempt >= self.max_retries:
+                    self.stats["failures"] += 1
+                    raise
+                delay = self._retry_after(e)
+                if delay is None:
+                    delay = random.uniform(0, min(self.retry_max_delay, self.retry_base_delay * 2 ** attempt))
+                attempt += 1
+                self.stats["retries"] += 1
+                await asyncio.sleep(delay)
+            except Exception:
+                self.stats["failures"] += 1
+                raise
+
+    def _retry_after(self, error: Exception) -> Optional[float]:
+        response = getattr(error, "response", None)
+        try:
+            return min(float(response.headers["retry-after"]), self.retry_max_delay)
+        except (AttributeError, KeyError, TypeError, ValueError):
+            return None
+
+
+# Global instance
+llm_gateway = LLMGateway(
+    api_key=settings.openai_api_key,
+    max_connections=settings.llm_max_connections,
+    max_keepalive_connections=settings.llm_max_keepalive_connections,
+    max_concurrency=settings.llm_max_concurrency,
+    model_concurrency=settings.llm_model_concurrency,
+    timeout=settings.llm_timeout_seconds,
+    max_retries=settings.llm_max_retries,
+    retry_base_delay=settings.llm_retry_base_delay,
+    retry_max_delay=settings.llm_retry_max_delay,
+    failure_threshold=settings.circuit_breaker_failure_threshold,
+    recovery_timeout=settings.circuit_breaker_recovery_seconds,
+)
@@ -0,0 +1,127 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+import numpy as np
+from app.config import settings
+
+
+class SemanticResponseCache:
+    """In-memory cache of final responses, looked up by query similarity.
+
+    A query gets a cached response when an earlier query of the same mode
+    has a cosine similarity of at least `threshold` with it and its
+    response is younger than `ttl_seconds`. At most `max_entries` responses
+    are kept, evicting the least recently used. Responses depend on the
+    indexed documents, so every call passes the current documents version
+    (chroma_client.get_documents_version) and the cache empties itself when
+    the version changes.
+    """
+
+    def __init__(self, threshold: float, ttl_seconds: float, max_entries: int):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._next_key = 0
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+        # Normalized vectors per mode, stacked for lookups; rebuilt after changes
+        self._matrices: Dict[str, Any] = {}
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0, "invalidations": 0}
+
+    def get(self, mode: str, embedding: List[float], documents_version: int) -> Optional[Dict[str, Any]]:
+        """The most similar fresh entry above the threshold, as {"query", "response", "similarity"}, or None."""
+        vector = self._normalize(embedding)
+        with self._lock:
+            self._check_version(documents_version)
+            self._expire()
+            keys, matrix = self._matrix(mode)
+            if vector is None or not keys or matrix.shape[1] != vector.shape[0]:
+                self.stats["misses"] += 1
+                return None
+            similarities = matrix @ vector
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                self.stats["misses"] += 1
+                return None
+            key = keys[best]
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            entry = self._entries[key]
+            return {"query": entry["query"], "response": entry["response"], "similarity": float(similarities[best])}
+
+    def put(self, mode: str, query: str, embedding: List[float], response: str, documents_version: int):
+        """Cache a response; `documents_version` is the version read before generating it."""
+        vector = self._normalize(embedding)
+        if vector is None:
+            return
+        with self._lock:
+            self._check_version(documents_version)
+            if documents_version != self._version:
+                # Documents changed while the response was generated
+                return
+            self._entries[self._next_key] = {
+                "mode": mode,
+                "query": query,
+                "vector": vector,
+                "response": response,
+                "created_at": time.monotonic(),
+            }
+            self._next_key += 1
+            self._matrices.pop(mode, None)
+            while len(self._entries) > self.max_entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._matrices.pop(evicted["mode"], None)
+                self.stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._matrices.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+    @staticmethod
+    def _normalize(embedding: List[float]):
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def _check_version(self, documents_version: int):
+        if self._version is None or documents_version > self._version:
+            if self._entries:
+                self.stats["invalidations"] += 1
+            self._entries.clear()
+            self._matrices.clear()
+            self._version = documents_version
+
+    def _expire(self):
+        cutoff = time.monotonic() - self.ttl_seconds
+        expired = [key for key, entry in self._entries.items() if entry["created_at"] < cutoff]
+        for key in expired:
+            self._matrices.pop(self._entries.pop(key)["mode"], None)
+        self.stats["expired"] += len(expired)
+
+    def _matrix(self, mode: str):
+        if mode not in self._matrices:
+            keys = [key for key, entry in self._entries.items() if entry["mode"] == mode]
+            matrix = np.stack([self._entries[key]["vector"] for key in keys]) if keys else None
+            self._matrices[mode] = (keys, matrix)
+        return self._matrices[mode]
+
+
+# Global instance
+response_cache = SemanticResponseCache(
+    threshold=settings.response_cache_threshold,
+    ttl_seconds=settings.response_cache_ttl_seconds,
+    max_entries=settings.response_cache_max_entries,
+)
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Concurrency benchmark for the SQLite data access layer
+Runs many simulated requests in parallel on one event loop and reports
+request latency and event loop lag, once with the previous blocking
+(SessionLocal) calls made inline and once with the async helpers,
+which run them on the dedicated database threads.
+
+Usage: python benchmark_db.py [--concurrency 50] [--requests 500]
+Uses a throwaway database unless DATABASE_URL is set.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+import uuid
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/benchmark.db"
+
+from app.db.models import Execution, Memory
+from app.db.sqlite_client import (
+    SessionLocal, engine, init_db,
+    create_execution, update_execution_status, create_memory_item, get_execution,
+)
+from datetime import datetime
+
+# Simulated non-database work per request (LLM call, retrieval, ...)
+WORK_SECONDS = 0.01
+LAG_PROBE_INTERVAL = 0.005
+
+
+def blocking_request():
+    """What a request did before: every query blocks the event loop."""
+    execution_id = str(uuid.uuid4())
+    with SessionLocal() as session:
+        session.add(Execution(id=execution_id, conversation_id=str(uuid.uuid4()), query="benchmark", status="running"))
+        session.commit()
+    with SessionLocal() as session:
+        session.query(Execution).filter(Execution.id == execution_id).first()
+    with SessionLocal() as session:
+        session.add(Memory(id=str(uuid.uuid4()), type="episodic", content=f"benchmark turn {execution_id}", source=execution_id))
+        session.commit()
+    with SessionLocal() as session:
+        execution = session.query(Execution).filter(Execution.id == execution_id).first()
+        execution.status = "completed"
+        execution.completed_at = datetime.utcnow()
+        session.commit()
+
+
+async def sync_request():
+    blocking_request()
+    await asyncio.sleep(WORK_SECONDS)
+
+
+async def async_request():
+    execution_id = str(uuid.uuid4())
+    await create_execution(execution_id, str(uuid.uuid4()), "benchmark")
+    await get_execution(execution_id)
+    await create_memory_item(str(uuid.uuid4()), f"benchmark turn {execution_id}", "episodic", execution_id)
+    await asyncio.sleep(WORK_SECONDS)
+    await update_execution_status(execution_id, "completed", "done")
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run(name, request, concurrency, total):
+    latencies, lags = [], []
+    semaphore = asyncio.Semaphore(concurrency)
+    running = True
+
+    async def probe():
+        # How late the loop wakes a task that asked to sleep briefly
+        while running:
+            start = time.perf_counter()
+            await asyncio.sleep(LAG_PROBE_INTERVAL)
+            lags.append(time.perf_counter() - start - LAG_PROBE_INTERVAL)
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            await request()
+            latencies.append(time.perf_counter() - start)
+
+    probe_task = asyncio.create_task(probe())
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - start
+    running = False
+    await probe_task
+
+    print(f"\n{name}: {total} requests, concurrency {concurrency}")
+    print(f"  throughput   {total / elapsed:8.1f} req/s")
+    print(f"  latency p50  {statistics.median(latencies) * 1000:8.1f} ms")
+    print(f"  latency p99  {percentile(latencies, 99) * 1000:8.1f} ms")
+    print(f"  loop lag p99 {percentile(lags, 99) * 1000:8.1f} ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    # Statement logging would dominate the timings
+    engine.echo = False
+    init_db()
+
+    print(f"🧪 Benchmarking {os.environ['DATABASE_URL']}")
+    await run("Blocking calls on the event loop", sync_request, args.concurrency, args.requests)
+    await run("Async data access layer (database threads)", async_request, args.concurrency, args.requests)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
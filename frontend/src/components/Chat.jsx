@@ -4,6 +4,8 @@ import styles from './Chat.module.css'
 
 export default function Chat({ onExecutionStart }) {
   const [input, setInput] = useState('')
+  // Pipeline the query runs through; incident answers may come from the response cache
+  const [mode, setMode] = useState('chat')
   const [messages, setMessages] = useState([
     { id: 'welcome', role: 'assistant', text: 'Hello — ask me about incidents or system issues.' },
   ])
@@ -23,7 +25,7 @@ export default function Chat({ onExecutionStart }) {
     setLoading(true)
 
     try {
-      const res = await submitChatQuery(text)
+      const res = await submitChatQuery(text, [], mode)
       // notify parent of execution id so ExecutionStream can subscribe
       if (res.execution_id && typeof onExecutionStart === 'function') {
         onExecutionStart(res.execution_id)
@@ -39,12 +41,44 @@ export default function Chat({ onExecutionStart }) {
       // also listen for SSE updates (optional)
       if (res.execution_id) {
         const es = createEventSource(res.execution_id)
+        // id of the assistant message being filled in by token events
+        let streamingId = null
         es.onmessage = (ev) => {
           try {
             const d = JSON.parse(ev.data)
+            if (d.event === 'token') {
+              if (streamingId === null) {
+                streamingId = Date.now() + 1
+                setMessages((m) => [...m, { id: streamingId, role: 'assistant', text: d.delta }])
+              } else {
+                setMessages((m) => m.map((msg) => msg.id === streamingId ? { ...msg, text: msg.text + d.delta } : msg))
+              }
+              return
+            }
+            if (d.event === 'stream_reset') {
+              // Generation failed midway; drop the partial draft, the fallback answer follows
+              if (streamingId !== null) {
+                const draftId = streamingId
+                setMessages((m) => m.filter((msg) => msg.id !== draftId))
+                streamingId = null
+              }
+              return
+            }
+            if (d.event === 'stream_blocked') {
+              // The guardrail cut the stream off; replace the draft with its message
+              if (streamingId !== null) {
+                setMessages((m) => m.map((msg) => msg.id === streamingId ? { ...msg, text: d.final_response } : msg))
+              }
+              return
+            }
             const answer = d.final_response || d.response || d.answer
             if ((d.event === 'final_response' || d.type === 'response' || d.status === 'completed') && answer) {
-              setMessages((m) => [...m, { id: Date.now() + 1, role: 'assistant', text: answer }])
+              // The final answer replaces the streamed draft (it may have been cleaned up or blocked)
+              if (streamingId !== null) {
+                setMessages((m) => m.map((msg) => msg.id === streamingId ? { ...msg, text: answer } : msg))
+              } else {
+                setMessages((m) => [...m, { id: Date.now() + 1, role: 'assistant', text: answer }])
+              }
               es.close()
               setLoading(false)
             }
@@ -76,6 +110,11 @@ export default function Chat({ onExecutionStart }) {
       </div>
 
       <div className={styles['chat-input']}>
+        <select value={mode} onChange={(e) => setMode(e.target.value)} aria-label="Mode">
+          <option value="chat">Chat</option>
+          <option value="incident">Incident</option>
+          <option value="self-service">Self-service</option>
+        </select>
         <input
           value={input}
           onChange={(e) => setInput(e.target.value)}
@@ -30,8 +30,8 @@ export default function ExecutionStream({ executionId }) {
     es.onmessage = (ev) => {
       try {
         const d = JSON.parse(ev.data)
-        // connected event
-        if (d.event === 'connected') return
+        // connected event; tokens are rendered by the chat view
+        if (d.event === 'connected' || d.event === 'token' || d.event === 'stream_blocked' || d.event === 'stream_reset') return
 
         // final response message
         if ((d.type === 'response' || d.event === 'final_response' || d.status === 'completed') && (d.final_response || d.response)) {
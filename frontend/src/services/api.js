@@ -15,8 +15,9 @@ client.interceptors.response.use(
   }
 )
 
-export async function submitChatQuery(query, attachments = [], mode = 'chat') {
-  const res = await client.post('/chat/query', { query, attachments, mode })
+export async function submitChatQuery(query, attachments = [], mode = 'chat', stream = true) {
+  // With stream the answer arrives as token events on the execution stream
+  const res = await client.post('/chat/query', { query, attachments, mode, stream })
   return res.data
 }
 
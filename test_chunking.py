@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test streaming chunking - chunks and offsets must not depend on how the
+text is split into blocks
+"""
+
+import re
+from app.utils.chunking import iter_chunks, mask_blocks
+
+TEXT = "\n".join(
+    f"Line {i}: payments gateway returned 502 for customer {i * 7} at 10.0.{i}.1" for i in range(200)
+)
+
+
+def blocks_of(text: str, size: int):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def test_fixed_size_chunks():
+    """Test exact-size chunks with overlap and their offsets"""
+    print("\n🧪 Testing fixed-size chunks...")
+    chunks = list(iter_chunks([TEXT], chunk_size=500, overlap=50))
+
+    for chunk, start, end in chunks:
+        assert TEXT[start:end] == chunk
+    assert all(len(chunk) == 500 for chunk, _, _ in chunks[:-1])
+    assert all(next_start == end - 50 for (_, _, end), (_, next_start, _) in zip(chunks, chunks[1:]))
+    assert chunks[0][1] == 0 and chunks[-1][2] == len(TEXT)
+    print(f"✅ {len(chunks)} chunks of 500 with 50 characters of overlap cover the text")
+
+
+def test_chunks_independent_of_block_size():
+    """Test that streamed blocks give the same chunks as the whole text"""
+    print("\n🧪 Testing block size independence...")
+    for split_on_boundary in (False, True):
+        expected = list(iter_chunks([TEXT], chunk_size=300, overlap=0 if split_on_boundary else 40, split_on_boundary=split_on_boundary))
+        for block_size in (1, 7, 299, 300, 301, 4096):
+            streamed = list(iter_chunks(blocks_of(TEXT, block_size), chunk_size=300, overlap=0 if split_on_boundary else 40, split_on_boundary=split_on_boundary))
+            assert streamed == expected, (split_on_boundary, block_size)
+    print("✅ Same chunks for block sizes 1 to 4096, with and without boundary splitting")
+
+
+def test_boundary_splitting():
+    """Test that boundary chunks end at line breaks and are stripped"""
+    print("\n🧪 Testing boundary splitting...")
+    chunks = list(iter_chunks(blocks_of(TEXT, 64), chunk_size=300, split_on_boundary=True))
+    lines = set(TEXT.split("\n"))
+
+    for chunk, start, end in chunks:
+        assert len(chunk) <= 300
+        assert chunk == chunk.strip() and chunk
+        # Whole lines only
+        assert all(line in lines for line in chunk.split("\n")), chunk
+    assert " ".join(chunk for chunk, _, _ in chunks).split() == TEXT.split()
+    print(f"✅ {len(chunks)} chunks of whole lines, no text lost")
+
+    # A single line longer than a chunk falls back to spaces
+    long_line = " ".join(["word"] * 100)
+    assert all(len(chunk) <= 50 and "wor d" not in chunk for chunk, _, _ in iter_chunks([long_line], 50, split_on_boundary=True))
+    print("✅ Long lines cut at spaces")
+
+
+def test_invalid_overlap():
+    """Test that an overlap as large as the chunk is rejected"""
+    try:
+        list(iter_chunks(["text"], chunk_size=10, overlap=10))
+    except ValueError:
+        print("\n✅ overlap >= chunk_size rejected")
+    else:
+        raise AssertionError("expected ValueError")
+
+
+def test_mask_blocks_never_splits_a_line():
+    """Test that masking streamed blocks gives the same result as masking the whole text"""
+    print("\n🧪 Testing masking across block boundaries...")
+
+    def mask_ips(text: str) -> str:
+        return re.sub(r"\b\d{1,3}(?:\.\d{1,3}){3}\b", "[IP]", text)
+
+    expected = mask_ips(TEXT)
+    for block_size in (3, 17, 256):
+        assert "".join(mask_blocks(blocks_of(TEXT, block_size), mask_ips)) == expected, block_size
+    assert "10.0." not in expected
+    print("✅ Every IP masked for block sizes 3, 17 and 256")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("CHUNKING TEST")
+    print("=" * 60)
+
+    test_fixed_size_chunks()
+    test_chunks_independent_of_block_size()
+    test_boundary_splitting()
+    test_invalid_overlap()
+    test_mask_blocks_never_splits_a_line()
+
+    print("\n" + "=" * 60)
+    print("✅ ALL TESTS PASSED")
+    print("=" * 60)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test the circuit breakers - state transitions, half-open probing, and how
+the LLM gateway counts upstream errors
+"""
+
+import asyncio
+import time
+import httpx
+import openai
+from app.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.utils.llm_gateway import LLMGateway
+
+
+def api_error(error_class, status: int):
+    response = httpx.Response(status, request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions"))
+    return error_class(f"HTTP {status}", response=response, body=None)
+
+
+def test_opens_after_consecutive_failures():
+    """Test that the breaker opens at the threshold and a success resets the count"""
+    print("\n🧪 Testing closed -> open...")
+    breaker = CircuitBreaker("chat", failure_threshold=3, recovery_timeout=60)
+
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow_request()
+    print("✅ Failures separated by a success don't open it")
+
+    breaker.record_failure()
+    assert breaker.state == "open" and breaker.is_open
+    assert not breaker.allow_request()
+    stats = breaker.get_stats()
+    assert stats["opened"] == 1 and stats["rejected"] == 1, stats
+    print("✅ Third consecutive failure opened it; calls are refused")
+
+
+def test_half_open_probe():
+    """Test that one probe is let through after the recovery timeout and decides the state"""
+    print("\n🧪 Testing half-open probing...")
+    breaker = CircuitBreaker("embeddings", failure_threshold=1, recovery_timeout=0.05)
+    breaker.record_failure()
+    assert not breaker.allow_request()
+
+    time.sleep(0.1)
+    assert breaker.state == "half_open" and not breaker.is_open
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    print("✅ Exactly one probe allowed")
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    print("✅ Failed probe reopened it")
+
+    time.sleep(0.1)
+    assert breaker.allow_request()
+    breaker.release()
+    assert breaker.allow_request()
+    print("✅ Released probe (e.g. cancelled) lets another one through")
+
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.get_stats()["consecutive_failures"] == 0
+    print("✅ Successful probe closed it")
+
+
+async def _gateway_counts_upstream_errors():
+    print("\n🧪 Testing gateway error classification...")
+    gateway = LLMGateway("x", 10, 5, 4, max_retries=0, failure_threshold=2, recovery_timeout=60)
+    breaker = gateway.breakers["chat"]
+
+    async def fail_with(error):
+        async def request():
+            raise error
+        try:
+            await gateway._with_retries("chat", request)
+        except Exception as e:
+            return e
+
+    # A bad request says nothing about the provider
+    for _ in range(3):
+        await fail_with(api_error(openai.BadRequestError, 400))
+    assert breaker.state == "closed" and breaker.get_stats()["consecutive_failures"] == 0
+    print("✅ Bad requests leave the breaker closed without counting as successes")
+
+    # A bad key fails every request, so it opens the breaker like an outage
+    await fail_with(api_error(openai.AuthenticationError, 401))
+    await fail_with(api_error(openai.InternalServerError, 500))
+    assert breaker.state == "open"
+    error = await fail_with(api_error(openai.BadRequestError, 400))
+    assert isinstance(error, CircuitOpenError), error
+    assert gateway.get_stats()["short_circuited"] == 1
+    print("✅ Auth and server errors opened it; later calls short-circuit")
+
+    # A success resets the count
+    gateway.breakers["embeddings"].record_failure()
+
+    async def ok():
+        return "ok"
+    assert await gateway._with_retries("embeddings", ok) == "ok"
+    assert gateway.breakers["embeddings"].get_stats()["consecutive_failures"] == 0
+    print("✅ Success reset the failure count")
+
+
+def test_gateway_counts_upstream_errors():
+    """Test which gateway errors count as upstream failures"""
+    asyncio.run(_gateway_counts_upstream_errors())
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("CIRCUIT BREAKER TEST")
+    print("=" * 60)
+
+    test_opens_after_consecutive_failures()
+    test_half_open_probe()
+    test_gateway_counts_upstream_errors()
+
+    print("\n" + "=" * 60)
+    print("✅ ALL TESTS PASSED")
+    print("=" * 60)
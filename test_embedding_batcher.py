@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test the embedding micro-batcher - coalescing, deduplication, size and
+token limits, and failure propagation
+"""
+
+import asyncio
+import time
+from app.utils.embeddings import EmbeddingBatcher
+
+
+class FakeEmbedder:
+    """Records each batch and returns a one-number vector per text."""
+
+    def __init__(self, fail: bool = False):
+        self.batches = []
+        self.fail = fail
+
+    async def __call__(self, texts):
+        self.batches.append(list(texts))
+        if self.fail:
+            raise RuntimeError("embedding API unavailable")
+        return [[float(len(text))] for text in texts]
+
+
+async def _concurrent_calls_share_a_batch():
+    """Test that callers within the window share one request and duplicates are embedded once"""
+    print("\n🧪 Testing coalescing and deduplication...")
+    embedder = FakeEmbedder()
+    batcher = EmbeddingBatcher(embedder, window_ms=20, max_batch_size=100, max_batch_tokens=10000)
+
+    results = await asyncio.gather(
+        batcher.embed(["alpha", "beta"]),
+        batcher.embed(["beta", "gamma"]),
+        batcher.embed(["alpha"]),
+    )
+
+    assert results == [[[5.0], [4.0]], [[4.0], [5.0]], [[5.0]]], results
+    assert embedder.batches == [["alpha", "beta", "gamma"]], embedder.batches
+    assert not batcher._tasks
+    print(f"✅ 3 calls -> {len(embedder.batches)} request with {len(embedder.batches[0])} unique texts")
+
+
+async def _full_batch_sent_without_waiting():
+    """Test that a batch that reaches max_batch_size goes out at once"""
+    print("\n🧪 Testing full batches skip the window...")
+    embedder = FakeEmbedder()
+    batcher = EmbeddingBatcher(embedder, window_ms=5000, max_batch_size=3, max_batch_tokens=10000)
+
+    started = time.perf_counter()
+    await asyncio.wait_for(batcher.embed(["a", "b", "c"]), timeout=1)
+    assert time.perf_counter() - started < 1
+    assert embedder.batches == [["a", "b", "c"]], embedder.batches
+    print("✅ Exactly full batch sent immediately")
+
+    await asyncio.wait_for(batcher.embed(["d", "e", "f", "g", "h", "i"]), timeout=1)
+    assert embedder.batches[1:] == [["d", "e", "f"], ["g", "h", "i"]], embedder.batches
+    print("✅ Oversized call split into full batches")
+
+
+async def _token_limit_splits_batches():
+    """Test that a batch stops before it would exceed max_batch_tokens"""
+    print("\n🧪 Testing token limit...")
+    embedder = FakeEmbedder()
+    batcher = EmbeddingBatcher(embedder, window_ms=10, max_batch_size=100, max_batch_tokens=10)
+
+    # Each 16-character text is estimated at 5 tokens
+    await batcher.embed(["x" * 16, "y" * 16, "z" * 16])
+    assert embedder.batches == [["x" * 16, "y" * 16], ["z" * 16]], embedder.batches
+    print(f"✅ Split into batches of {[len(batch) for batch in embedder.batches]}")
+
+
+async def _failure_reaches_every_caller():
+    """Test that a failed request fails every caller waiting on that batch"""
+    print("\n🧪 Testing failure propagation...")
+    batcher = EmbeddingBatcher(FakeEmbedder(fail=True), window_ms=10, max_batch_size=100, max_batch_tokens=10000)
+
+    results = await asyncio.gather(batcher.embed(["a"]), batcher.embed(["b"]), return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results), results
+    assert batcher.get_stats()["failed_batches"] == 1
+    print("✅ Both callers got the error")
+
+
+def test_concurrent_calls_share_a_batch():
+    asyncio.run(_concurrent_calls_share_a_batch())
+
+
+def test_full_batch_sent_without_waiting():
+    asyncio.run(_full_batch_sent_without_waiting())
+
+
+def test_token_limit_splits_batches():
+    asyncio.run(_token_limit_splits_batches())
+
+
+def test_failure_reaches_every_caller():
+    asyncio.run(_failure_reaches_every_caller())
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("EMBEDDING BATCHER TEST")
+    print("=" * 60)
+
+    test_concurrent_calls_share_a_batch()
+    test_full_batch_sent_without_waiting()
+    test_token_limit_splits_batches()
+    test_failure_reaches_every_caller()
+
+    print("\n" + "=" * 60)
+    print("✅ ALL TESTS PASSED")
+    print("=" * 60)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Test the execution event bus - replay, bounded history and when streams
+must fall back to the database
+"""
+
+import asyncio
+import threading
+from app.core.event_bus import EventBus
+
+
+def event(event_id: int, execution_id: str = "exec-1"):
+    return {"id": event_id, "event_type": "agent_started", "execution_id": execution_id}
+
+
+async def _replay_and_live_events():
+    print("\n🧪 Testing replay and live delivery...")
+    bus = EventBus(history_size=10)
+    bus.open("exec-1")
+    for event_id in (1, 2, 3):
+        bus.publish("exec-1", event(event_id))
+
+    history, subscription = bus.subscribe("exec-1", after_id=1)
+    assert [e["id"] for e in history] == [2, 3]
+    print("✅ History after the resume id replayed")
+
+    bus.publish("exec-1", event(4))
+    thread = threading.Thread(target=bus.publish, args=("exec-1", event(5)))
+    thread.start()
+    thread.join()
+    assert (await subscription.get(timeout=1))["id"] == 4
+    assert (await subscription.get(timeout=1))["id"] == 5
+    assert await subscription.get(timeout=0.01) is None
+    print("✅ Live events delivered, including from another thread")
+
+    bus.unsubscribe(subscription)
+    assert bus.get_stats()["subscribers"] == 0
+
+
+def test_replay_and_live_events():
+    """Test that a subscriber gets the history after its id, then live events"""
+    asyncio.run(_replay_and_live_events())
+
+
+async def _history_truncation():
+    print("\n🧪 Testing history truncation...")
+    bus = EventBus(history_size=3)
+    for event_id in range(1, 6):
+        bus.publish("exec-1", event(event_id))
+
+    # Events 1 and 2 were pushed out; only streams past them can use the bus
+    history, subscription = bus.subscribe("exec-1", after_id=0)
+    assert history is None
+    bus.unsubscribe(subscription)
+    history, subscription = bus.subscribe("exec-1", after_id=1)
+    assert history is None
+    bus.unsubscribe(subscription)
+    print("✅ Resuming before dropped events falls back to the database")
+
+    history, subscription = bus.subscribe("exec-1", after_id=2)
+    assert [e["id"] for e in history] == [3, 4, 5]
+    bus.unsubscribe(subscription)
+    history, subscription = bus.subscribe("exec-1", after_id=5)
+    assert history == []
+    bus.unsubscribe(subscription)
+    print("✅ Resuming after them replays the kept history")
+
+
+def test_history_truncation():
+    """Test that a subscriber is sent to the database when its events were dropped"""
+    asyncio.run(_history_truncation())
+
+
+async def _unknown_and_evicted_executions():
+    print("\n🧪 Testing unknown and evicted executions...")
+    bus = EventBus(max_executions=2)
+    history, subscription = bus.subscribe("never-seen")
+    assert history is None
+    bus.unsubscribe(subscription)
+    print("✅ Unknown execution falls back to the database")
+
+    bus.publish("exec-1", event(1, "exec-1"))
+    watched, watching = bus.subscribe("exec-1")
+    bus.publish("exec-2", event(2, "exec-2"))
+    bus.publish("exec-3", event(3, "exec-3"))
+    bus.publish("exec-4", event(4, "exec-4"))
+
+    assert [e["id"] for e in watched] == [1]
+    history, subscription = bus.subscribe("exec-2")
+    assert history is None
+    print("✅ Oldest unwatched execution evicted; watched one kept")
+
+    bus.unsubscribe(watching)
+    bus.unsubscribe(subscription)
+
+    # Events without an execution id are ignored
+    bus.publish("", event(5))
+    assert bus.get_stats()["published"] == 4
+
+
+def test_unknown_and_evicted_executions():
+    """Test the fallback for executions the bus never saw or has evicted"""
+    asyncio.run(_unknown_and_evicted_executions())
+
+
+async def _slow_subscriber_overflows():
+    print("\n🧪 Testing slow subscriber...")
+    bus = EventBus(subscriber_queue_size=2)
+    bus.open("exec-1")
+    _, subscription = bus.subscribe("exec-1")
+    for event_id in range(1, 5):
+        bus.publish("exec-1", event(event_id))
+
+    assert subscription.overflowed
+    assert [(await subscription.get(timeout=1))["id"] for _ in range(2)] == [1, 2]
+    assert await subscription.get(timeout=0.01) is None
+    bus.unsubscribe(subscription)
+    assert bus.get_stats()["overflows"] == 1
+    print("✅ Full queue marks the subscriber overflowed instead of blocking")
+
+
+def test_slow_subscriber_overflows():
+    """Test that a subscriber that falls behind is flagged, not blocked on"""
+    asyncio.run(_slow_subscriber_overflows())
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("EVENT BUS TEST")
+    print("=" * 60)
+
+    test_replay_and_live_events()
+    test_history_truncation()
+    test_unknown_and_evicted_executions()
+    test_slow_subscriber_overflows()
+
+    print("\n" + "=" * 60)
+    print("✅ ALL TESTS PASSED")
+    print("=" * 60)
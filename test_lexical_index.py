@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Test the BM25 keyword index - tokenizing, ranking, incremental updates and
+searches running alongside writes
+"""
+
+import tempfile
+import threading
+from pathlib import Path
+from app.db.lexical_index import BM25Index, tokenize
+
+
+def make_index(tmp: str) -> BM25Index:
+    index = BM25Index(str(Path(tmp) / "lexical_index.db"))
+    index.add(
+        "documents",
+        ["d1", "d2", "d3"],
+        [
+            "Payments gateway returned 502 errors after the v2.1 deploy",
+            "Restart the redis cluster when failover stalls",
+            "Gateway timeouts during INC-1023 were caused by redis failover",
+        ],
+        [
+            {"source": "runbook.md", "type": "runbook"},
+            {"source": "runbook.md", "type": "runbook"},
+            {"source": "incidents.md", "type": "incident"},
+        ],
+    )
+    return index
+
+
+def test_tokenize():
+    """Test that compound identifiers are indexed whole and by their parts"""
+    print("\n🧪 Testing tokenizer...")
+    assert tokenize("The INC-1023 fix is in v2.1") == ["inc-1023", "inc", "1023", "fix", "v2.1", "v2", "1"]
+    print("✅ Compound identifiers split, stopwords dropped")
+
+
+def test_ranking_and_filters():
+    """Test BM25 ranking, identifier lookups and the type filter"""
+    print("\n🧪 Testing search ranking...")
+    with tempfile.TemporaryDirectory() as tmp:
+        index = make_index(tmp)
+        assert index.count("documents") == 3
+
+        results = index.search("documents", "redis failover")
+        assert results["ids"][0][:2] in (["d2", "d3"], ["d3", "d2"]), results["ids"]
+        assert "d1" not in results["ids"][0]
+        # Closer matches come first, with lower (negated BM25) distances
+        assert results["distances"][0] == sorted(results["distances"][0])
+        print(f"✅ 'redis failover' -> {results['ids'][0]}")
+
+        assert index.search("documents", "inc-1023")["ids"][0] == ["d3"]
+        assert index.search("documents", "1023")["ids"][0] == ["d3"]
+        print("✅ Identifier found whole and by its parts")
+
+        assert index.search("documents", "gateway", doc_type="incident")["ids"][0] == ["d3"]
+        print("✅ Type filter applied")
+
+        assert index.search("documents", "kubernetes")["ids"] == [[]]
+        assert index.search("memory", "gateway")["ids"] == [[]]
+        print("✅ No matches and unknown collections return empty results")
+
+
+def test_incremental_updates():
+    """Test that re-adding replaces a document and deleting by source removes it"""
+    print("\n🧪 Testing incremental updates...")
+    with tempfile.TemporaryDirectory() as tmp:
+        index = make_index(tmp)
+
+        index.add("documents", ["d1"], ["Kafka consumer lag alert"], [{"source": "alerts.md"}])
+        assert index.count("documents") == 3
+        assert index.search("documents", "payments")["ids"] == [[]]
+        assert index.search("documents", "kafka")["ids"][0] == ["d1"]
+        print("✅ Re-added document replaced its old text")
+
+        index.delete("documents", source="runbook.md")
+        assert index.count("documents") == 2
+        assert index.search("documents", "restart")["ids"] == [[]]
+        index.delete("documents", ids=["d3"])
+        assert index.search("documents", "gateway")["ids"] == [[]]
+        assert index.count("documents") == 1
+        print("✅ Deleted by source and by id")
+
+
+def test_search_does_not_wait_for_writes():
+    """Test that a search completes while a write holds the write lock"""
+    print("\n🧪 Testing search during a write...")
+    with tempfile.TemporaryDirectory() as tmp:
+        index = make_index(tmp)
+        results = {}
+        with index._lock:
+            searcher = threading.Thread(target=lambda: results.update(index.search("documents", "redis")))
+            searcher.start()
+            searcher.join(timeout=5)
+            assert not searcher.is_alive(), "search blocked behind the write lock"
+        assert set(results["ids"][0]) == {"d2", "d3"}
+        print("✅ Search answered from its own connection")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("BM25 INDEX TEST")
+    print("=" * 60)
+
+    test_tokenize()
+    test_ranking_and_filters()
+    test_incremental_updates()
+    test_search_does_not_wait_for_writes()
+
+    print("\n" + "=" * 60)
+    print("✅ ALL TESTS PASSED")
+    print("=" * 60)
@@ -22,7 +22,7 @@ async def test_memory_correlation():
     execution_id = str(uuid.uuid4())
     
     # Create execution record
-    create_execution(execution_id, conversation_id, "What are the key metrics for system performance?")
+    await create_execution(execution_id, conversation_id, "What are the key metrics for system performance?")
     
     # Store some historical memories
     print("\n📝 Seeding historical memories...")
@@ -41,7 +41,7 @@ async def test_memory_write_and_read():
     
     # Read back memories
     print("\n📖 Reading memories from database...")
-    stored_memories = get_memory_items()
+    stored_memories = await get_memory_items()
     
     print(f"✅ Found {len(stored_memories)} memories in database")
     
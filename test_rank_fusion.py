@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test reciprocal rank fusion of the dense and BM25 result sets
+"""
+
+from app.agents.retrieval_agent import reciprocal_rank_fusion
+
+
+def results(*ids):
+    return {
+        "ids": [list(ids)],
+        "documents": [[f"text of {doc_id}" for doc_id in ids]],
+        "metadatas": [[{"source": f"{doc_id}.md"} for doc_id in ids]],
+    }
+
+
+def test_fusion_scores():
+    """Test that scores are the sum of 1 / (k + rank) over both lists"""
+    print("\n🧪 Testing fused scores...")
+    fused = reciprocal_rank_fusion([results("a", "b", "c"), results("c", "a", "d")], k=60, n_results=10)
+
+    expected = {
+        "a": 1 / 61 + 1 / 62,
+        "c": 1 / 63 + 1 / 61,
+        "b": 1 / 62,
+        "d": 1 / 63,
+    }
+    assert fused["ids"][0] == ["a", "c", "b", "d"], fused["ids"]
+    for doc_id, score in zip(fused["ids"][0], fused["scores"][0]):
+        assert abs(score - expected[doc_id]) < 1e-12, (doc_id, score)
+    print(f"✅ Fused order {fused['ids'][0]}")
+
+    assert fused["documents"][0][1] == "text of c"
+    assert fused["metadatas"][0][1] == {"source": "c.md"}
+    print("✅ Documents and metadatas follow their ids")
+
+
+def test_agreement_beats_a_single_top_hit():
+    """Test that a document found by both retrievers outranks one found by only one"""
+    print("\n🧪 Testing agreement between retrievers...")
+    fused = reciprocal_rank_fusion([results("x", "shared"), results("y", "z", "shared")], n_results=2)
+    assert fused["ids"][0][0] == "shared", fused["ids"]
+    print("✅ Document found by both lists ranks first")
+
+
+def test_truncation_and_empty_inputs():
+    """Test n_results, empty lists and missing metadatas"""
+    print("\n🧪 Testing truncation and empty inputs...")
+    fused = reciprocal_rank_fusion([results("a", "b", "c", "d"), results()], n_results=2)
+    assert fused["ids"][0] == ["a", "b"]
+    assert len(fused["documents"][0]) == len(fused["scores"][0]) == 2
+    print("✅ Cut to n_results")
+
+    no_metadata = {"ids": [["a"]], "documents": [["text"]], "metadatas": None}
+    assert reciprocal_rank_fusion([no_metadata])["metadatas"] == [[{}]]
+    print("✅ Missing metadatas become empty dicts")
+
+    assert reciprocal_rank_fusion([]) == {"documents": [[]], "metadatas": [[]], "ids": [[]], "scores": [[]]}
+    print("✅ No result sets give an empty result")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("RANK FUSION TEST")
+    print("=" * 60)
+
+    test_fusion_scores()
+    test_agreement_beats_a_single_top_hit()
+    test_truncation_and_empty_inputs()
+
+    print("\n" + "=" * 60)
+    print("✅ ALL TESTS PASSED")
+    print("=" * 60)
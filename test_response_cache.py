@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test the semantic response cache - similarity threshold, TTL, LRU eviction
+and invalidation when documents change
+"""
+
+import time
+from app.utils.response_cache import SemanticResponseCache
+
+
+def test_similar_query_hits():
+    """Test that only similar queries of the same mode get the cached response"""
+    print("\n🧪 Testing similarity lookups...")
+    cache = SemanticResponseCache(threshold=0.95, ttl_seconds=60, max_entries=10)
+    cache.put("incident", "why is the gateway returning 502s?", [1.0, 0.0, 0.0], "Gateway pods are restarting", documents_version=0)
+
+    hit = cache.get("incident", [0.99, 0.05, 0.0], documents_version=0)
+    assert hit and hit["response"] == "Gateway pods are restarting", hit
+    assert hit["similarity"] >= 0.95
+    print(f"✅ Near-duplicate hit (similarity {hit['similarity']:.3f})")
+
+    assert cache.get("incident", [0.0, 1.0, 0.0], documents_version=0) is None
+    print("✅ Unrelated query missed")
+    assert cache.get("chat", [1.0, 0.0, 0.0], documents_version=0) is None
+    print("✅ Other mode missed")
+    assert cache.get("incident", [0.0, 0.0, 0.0], documents_version=0) is None
+    print("✅ Zero vector (failed embedding) missed")
+
+    stats = cache.get_stats()
+    assert stats["hits"] == 1 and stats["misses"] == 3, stats
+
+
+def test_ttl_expiry():
+    """Test that responses older than the TTL are not served"""
+    print("\n🧪 Testing TTL expiry...")
+    cache = SemanticResponseCache(threshold=0.95, ttl_seconds=0.05, max_entries=10)
+    cache.put("incident", "q", [1.0, 0.0], "answer", documents_version=0)
+    assert cache.get("incident", [1.0, 0.0], documents_version=0) is not None
+    time.sleep(0.1)
+    assert cache.get("incident", [1.0, 0.0], documents_version=0) is None
+    assert cache.get_stats()["expired"] == 1
+    print("✅ Expired entry dropped")
+
+
+def test_lru_eviction():
+    """Test that the least recently used entry is evicted first"""
+    print("\n🧪 Testing LRU eviction...")
+    cache = SemanticResponseCache(threshold=0.95, ttl_seconds=60, max_entries=2)
+    cache.put("incident", "a", [1.0, 0.0, 0.0], "A", documents_version=0)
+    cache.put("incident", "b", [0.0, 1.0, 0.0], "B", documents_version=0)
+    # Touch "a" so "b" becomes the least recently used
+    assert cache.get("incident", [1.0, 0.0, 0.0], documents_version=0)["response"] == "A"
+    cache.put("incident", "c", [0.0, 0.0, 1.0], "C", documents_version=0)
+
+    assert cache.get("incident", [0.0, 1.0, 0.0], documents_version=0) is None
+    assert cache.get("incident", [1.0, 0.0, 0.0], documents_version=0)["response"] == "A"
+    assert cache.get("incident", [0.0, 0.0, 1.0], documents_version=0)["response"] == "C"
+    assert cache.get_stats()["evictions"] == 1
+    print("✅ Least recently used entry evicted")
+
+
+def test_documents_version_invalidation():
+    """Test that ingesting documents empties the cache"""
+    print("\n🧪 Testing invalidation on documents version change...")
+    cache = SemanticResponseCache(threshold=0.95, ttl_seconds=60, max_entries=10)
+    cache.put("incident", "q", [1.0, 0.0], "old answer", documents_version=1)
+    assert cache.get("incident", [1.0, 0.0], documents_version=2) is None
+    assert cache.get_stats()["invalidations"] == 1
+    print("✅ Newer documents version invalidated the cache")
+
+    # An answer generated against documents that changed meanwhile is not cached
+    cache.put("incident", "q", [1.0, 0.0], "stale answer", documents_version=1)
+    assert cache.get("incident", [1.0, 0.0], documents_version=2) is None
+    print("✅ Answer from an older documents version not cached")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("RESPONSE CACHE TEST")
+    print("=" * 60)
+
+    test_similar_query_hits()
+    test_ttl_expiry()
+    test_lru_eviction()
+    test_documents_version_invalidation()
+
+    print("\n" + "=" * 60)
+    print("✅ ALL TESTS PASSED")
+    print("=" * 60)
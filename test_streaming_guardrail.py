@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test the streaming output guardrail - policy terms split across chunks must
+be caught before any part of them is released
+"""
+
+from app.agents.guardrail_agent import StreamingOutputGuardrail, POLICY_TERMS
+
+SAFE_TEXT = "Restart the payments gateway, then check the redis failover logs for errors."
+
+
+def stream(text: str, chunk_size: int):
+    guardrail = StreamingOutputGuardrail()
+    released = []
+    for i in range(0, len(text), chunk_size):
+        released.append(guardrail.feed(text[i:i + chunk_size]))
+    remaining, validation = guardrail.close()
+    released.append(remaining)
+    return guardrail, "".join(released), validation
+
+
+def test_safe_text_released_unchanged():
+    """Test that safe text is released in full whatever the chunk size"""
+    print("\n🧪 Testing safe responses...")
+    for chunk_size in (1, 2, 5, 8, 100):
+        guardrail, released, validation = stream(SAFE_TEXT, chunk_size)
+        assert released == SAFE_TEXT, chunk_size
+        assert validation["valid"] and not guardrail.blocked
+    print("✅ Safe text released unchanged for chunk sizes 1 to 100")
+
+
+def test_hold_back():
+    """Test that only the last lookback characters are held back"""
+    print("\n🧪 Testing hold-back...")
+    guardrail = StreamingOutputGuardrail()
+    assert guardrail.lookback == max(len(term) for term in POLICY_TERMS) - 1
+    released = guardrail.feed(SAFE_TEXT)
+    assert released == SAFE_TEXT[:-guardrail.lookback]
+    assert guardrail.feed("") == ""
+    assert guardrail.close()[0] == SAFE_TEXT[-guardrail.lookback:]
+    print(f"✅ {guardrail.lookback} characters held until the next chunk")
+
+
+def test_term_split_across_chunks():
+    """Test that a policy term split across chunks is blocked with none of it released"""
+    print("\n🧪 Testing terms split across chunks...")
+    for term in POLICY_TERMS:
+        text = f"This step is {term.upper()} to run in production without approval."
+        start = text.lower().index(term)
+        for chunk_size in (1, 2, 3, 4, 7):
+            guardrail, released, validation = stream(text, chunk_size)
+            assert guardrail.blocked and not validation["valid"], (term, chunk_size)
+            assert "policy_violation" in validation["issues"]
+            # Nothing from the term onwards reached the client
+            assert text.startswith(released) and len(released) <= start, (term, chunk_size, released)
+    print("✅ Every policy term blocked for chunk sizes 1 to 7")
+
+
+def test_blocked_stream_releases_nothing_more():
+    """Test that once blocked, later chunks are dropped"""
+    print("\n🧪 Testing blocked stream...")
+    guardrail = StreamingOutputGuardrail()
+    guardrail.feed("That would be harm")
+    assert guardrail.feed("ful. Anyway, restart the gateway.") == ""
+    assert guardrail.feed(" More safe text.") == ""
+    assert guardrail.close() == ("", {"valid": False, "issues": ["policy_violation"]})
+    print("✅ Nothing released after the block")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("STREAMING GUARDRAIL TEST")
+    print("=" * 60)
+
+    test_safe_text_released_unchanged()
+    test_hold_back()
+    test_term_split_across_chunks()
+    test_blocked_stream_releases_nothing_more()
+
+    print("\n" + "=" * 60)
+    print("✅ ALL TESTS PASSED")
+    print("=" * 60)